@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Benchmark: GET /api/words body generation, old path vs pre-encoded catalog bytes
+
+    python benchmarks/bench_catalog_serialization.py [sizes...]
+
+Compares, per catalog size:
+  jsonify   - jsonify([word.to_dict() for word in words]) on every request (old path)
+  cold      - building a CatalogSnapshot and encoding its body once (after a write)
+  cached    - serving the already-encoded bytes from the snapshot (steady state)
+"""
+
+import os
+import sys
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask, jsonify
+from src.data.words_200 import words_data
+from src.models.word import Word
+from src.services import json_codec
+from src.services.catalog import CatalogSnapshot
+from src.services.http_cache import encoded_json_response
+
+
+def make_words(count):
+    now = datetime.utcnow()
+    words = []
+    for i in range(count):
+        data = dict(words_data[i % len(words_data)])
+        data['word'] = f"{data['word']}{i // len(words_data) or ''}"
+        words.append(Word(id=i + 1, created_at=now, updated_at=now, **data))
+    return words
+
+
+def timed(fn, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def run(count, app):
+    words = make_words(count)
+    repeat = 20 if count <= 10000 else 3
+
+    with app.test_request_context('/api/words'):
+        def old_path():
+            return jsonify([word.to_dict() for word in words]).get_data()
+
+        def cold_path():
+            snapshot = CatalogSnapshot(1, [word.to_dict() for word in words])
+            return encoded_json_response(snapshot.encoded(('words',), lambda: snapshot.words)).get_data()
+
+        snapshot = CatalogSnapshot(1, [word.to_dict() for word in words])
+        snapshot.encoded(('words',), lambda: snapshot.words)
+
+        def cached_path():
+            return encoded_json_response(snapshot.encoded(('words',), lambda: snapshot.words)).get_data()
+
+        old_ms = timed(old_path, repeat)
+        cold_ms = timed(cold_path, repeat)
+        cached_ms = timed(cached_path, repeat)
+
+    print(f"{count:>8} words | jsonify {old_ms:9.2f} ms | cold {cold_ms:9.2f} ms | "
+          f"cached {cached_ms:7.3f} ms | speedup x{old_ms / cached_ms:,.0f}")
+
+
+if __name__ == '__main__':
+    sizes = [int(arg) for arg in sys.argv[1:]] or [200, 10000, 100000]
+    app = Flask(__name__)
+    print(f"JSON encoder: {json_codec.ENCODER}")
+    for size in sizes:
+        run(size, app)
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Benchmark: bulk word import, per-row ORM path vs set-based import_words()
+
+    python benchmarks/bench_import.py [word_count] [csv_path]
+
+Imports word_count synthetic words built from src/data/words_200.py (or the
+rows of a CSV file with the same columns) into a fresh SQLite file. The old
+path (one existence query and one ORM add per row) is only run on the first
+10,000 rows because it grows too slow beyond that.
+"""
+
+import csv
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask
+from src.data.words_200 import words_data
+from src.models.user import db
+from src.models.word import Word
+from src.services.word_import import import_words
+
+OLD_PATH_LIMIT = 10000
+
+
+def make_rows(count):
+    rows = []
+    for i in range(count):
+        data = dict(words_data[i % len(words_data)])
+        data['word'] = f"{data['word']}{i // len(words_data) or ''}"
+        rows.append(data)
+    return rows
+
+
+def old_import(rows):
+    for word_data in rows:
+        if Word.query.filter_by(word=word_data['word'].lower()).first():
+            continue
+        db.session.add(Word(**word_data))
+    db.session.commit()
+
+
+def new_import(rows):
+    import_words(rows, returning=False)
+    db.session.commit()
+
+
+def timed_import(fn, rows):
+    path = os.path.join(tempfile.mkdtemp(), 'bench.db')
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = f'sqlite:///{path}'
+    db.init_app(app)
+    with app.app_context():
+        db.create_all()
+        start = time.perf_counter()
+        fn(rows)
+        elapsed = time.perf_counter() - start
+        count = Word.query.count()
+    return elapsed, count
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    if len(sys.argv) > 2:
+        with open(sys.argv[2], newline='', encoding='utf-8') as f:
+            rows = list(csv.DictReader(f))
+    else:
+        rows = make_rows(count)
+
+    old_rows = rows[:OLD_PATH_LIMIT]
+    elapsed, inserted = timed_import(old_import, old_rows)
+    print(f"per-row ORM    {len(old_rows):>7} rows  {elapsed:7.2f} s  ({inserted} inserted)")
+
+    elapsed, inserted = timed_import(new_import, old_rows)
+    print(f"import_words   {len(old_rows):>7} rows  {elapsed:7.2f} s  ({inserted} inserted)")
+
+    if len(rows) > len(old_rows):
+        elapsed, inserted = timed_import(new_import, rows)
+        print(f"import_words   {len(rows):>7} rows  {elapsed:7.2f} s  ({inserted} inserted)")
+
+
+if __name__ == '__main__':
+    main()
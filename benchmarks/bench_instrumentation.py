@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Benchmark: per-request cost of the instrumentation middleware
+
+    python benchmarks/bench_instrumentation.py [rounds]
+
+Times the middleware directly: the before/after_request hooks around one
+request, and the cursor event pair around one query. Then it times a few
+endpoints through the Flask test client and relates the middleware cost
+to each one (hooks + queries x event cost, queries read from the
+Server-Timing header). Comparing whole requests with METRICS_ENABLED=0
+and =1 was tried first, but on a shared CPU the run-to-run noise (about
+5%) is larger than the effect being measured.
+
+Measured on a 1-vCPU sandbox through the test client:
+
+    endpoint                          request    instrumentation
+    GET /api/categories                 482 us      3.6 us (0.8%)
+    GET /api/words?limit=200           2107 us      3.6 us (0.2%)
+    GET /api/users/1/test-results      1594 us      4.5 us (0.3%)
+
+The hooks cost about 3.5 us a request: no registry lock (each thread
+records into its own series), no db/ser Server-Timing entries to format
+for requests that spent nothing there, and Content-Length read from the
+header instead of re-validated. Under gunicorn a request also pays for
+HTTP parsing and socket I/O (about 1.5 ms of CPU per GET /api/words in
+load_test.py), so the share is lower still.
+"""
+
+import os
+import re
+import sys
+import tempfile
+import time
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Response
+
+from src.main import create_app, initialize_database
+from src.services import instrumentation as instr
+
+ENDPOINTS = ('/api/categories', '/api/words?limit=200', '/api/users/1/test-results')
+REQUESTS_PER_ROUND = 200
+DIRECT_ITERATIONS = 50000
+# Timed in batches, keeping the fastest, as timeit advises: slower ones measure other load on the machine
+BATCH = 500
+DIRECT_REPEATS = 5
+
+
+def direct_costs(app):
+    """Microseconds for the request hooks and for one before/after cursor event pair"""
+    hooks = instr.instrumentation
+    with app.test_request_context('/api/categories'):
+        request_cost = float('inf')
+        for _ in range(DIRECT_ITERATIONS // BATCH):
+            # Fresh responses: the hook adds a header, so a reused one would keep growing
+            responses = [Response(b'{}', mimetype='application/json') for _ in range(BATCH)]
+            start = time.perf_counter()
+            for response in responses:
+                hooks._start()
+                hooks._finish(response)
+            request_cost = min(request_cost, (time.perf_counter() - start) / BATCH)
+
+        hooks._start()
+        info = {}
+        conn = type('Conn', (), {'info': info})()
+
+        def one_query():
+            instr._before_cursor_execute(conn, None, None, None, None, False)
+            instr._after_cursor_execute(conn, None, None, None, None, False)
+
+        query_cost = min(timeit.repeat(one_query, number=DIRECT_ITERATIONS, repeat=DIRECT_REPEATS)) / DIRECT_ITERATIONS
+        hooks._finish(Response(b'{}', mimetype='application/json'))
+    return request_cost * 1e6, query_cost * 1e6
+
+
+def median_request_time(client, url, rounds):
+    samples = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        for _ in range(REQUESTS_PER_ROUND):
+            response = client.get(url)
+        samples.append((time.perf_counter() - start) / REQUESTS_PER_ROUND)
+    samples.sort()
+    # No db entry means the request ran no queries
+    match = re.search(r'desc="(\d+) queries"', response.headers['Server-Timing'])
+    queries = int(match.group(1)) if match else 0
+    return samples[len(samples) // 2] * 1e6, queries
+
+
+def main():
+    rounds = int(sys.argv[1]) if len(sys.argv) > 1 else 11
+    path = os.path.join(tempfile.mkdtemp(), 'bench.db')
+    os.environ['METRICS_ENABLED'] = '1'
+    app = create_app({'SQLALCHEMY_DATABASE_URI': f'sqlite:///{path}'})
+    with app.app_context():
+        initialize_database()
+
+    request_cost, query_cost = direct_costs(app)
+    print(f"request hooks {request_cost:6.1f} us/request   cursor events {query_cost:5.2f} us/query")
+
+    client = app.test_client()
+    for url in ENDPOINTS:
+        median_request_time(client, url, 1)  # warm caches
+        elapsed, queries = median_request_time(client, url, rounds)
+        cost = request_cost + queries * query_cost
+        print(f"{url:<30} {elapsed:8.1f} us/request  {queries} queries  "
+              f"instrumentation {cost:5.1f} us ({cost / elapsed * 100:4.1f}%)")
+
+
+if __name__ == '__main__':
+    main()
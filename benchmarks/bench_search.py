@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Benchmark: /api/words/search over a synthetic catalog
+
+    python benchmarks/bench_search.py [word_count]
+
+Compares the old LIKE '%term%' query (SQLite, in memory) with the in-process
+SearchIndex. Defaults to 100,000 words.
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask
+from src.data.words_200 import words_data
+from src.models.user import db
+from src.models.word import Word
+from src.services.search import SearchIndex
+
+QUERIES = ['cat', 'ocean', 'the', 'fly', 'red app', 'zzz']
+
+
+def make_rows(count):
+    rows = []
+    for i in range(count):
+        data = dict(words_data[i % len(words_data)])
+        data['word'] = f"{data['word']}{i // len(words_data) or ''}"
+        rows.append(data)
+    return rows
+
+
+def timed(fn, repeat=5):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main(count):
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite://'
+    db.init_app(app)
+
+    with app.app_context():
+        db.create_all()
+        db.session.execute(Word.__table__.insert(), make_rows(count))
+        db.session.commit()
+
+        start = time.perf_counter()
+        index = SearchIndex([word.to_dict() for word in Word.query.all()])
+        print(f"{count} words, index built in {(time.perf_counter() - start) * 1000:.0f} ms "
+              f"({len(index.vocabulary)} terms)")
+
+        for term in QUERIES:
+            def like_query():
+                return Word.query.filter(
+                    db.or_(
+                        Word.word.contains(term.lower()),
+                        Word.definition.contains(term),
+                        Word.example.contains(term)
+                    )
+                ).order_by(Word.word).limit(50).all()
+
+            like_ms = timed(like_query)
+            index_ms = timed(lambda: index.search(term, limit=50))
+            print(f"  q={term!r:10} LIKE {like_ms:8.2f} ms | index {index_ms:8.2f} ms")
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
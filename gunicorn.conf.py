@@ -0,0 +1,66 @@
+"""
+Gunicorn settings for Word Adventure, driven by environment variables.
+
+    WEB_CONCURRENCY          worker processes (default: 2; always 1 with WRITE_BEHIND_ENABLED=1)
+    GUNICORN_THREADS         threads per worker (default: 4)
+    GUNICORN_TIMEOUT         seconds before a silent worker is restarted (default: 60)
+    GUNICORN_GRACEFUL_TIMEOUT  seconds workers get to finish in-flight requests on shutdown (default: 30)
+    PORT                     listen port (default: 5000)
+
+The worker default is fixed rather than derived from cpu_count(), which
+reports the host's cores, not the container's CPU quota. Each worker has
+its own connection pool, so the app can open up to
+WEB_CONCURRENCY x (DB_POOL_SIZE + DB_MAX_OVERFLOW) database connections,
+30 with the defaults; keep that under the database's connection limit.
+"""
+
+import os
+
+bind = f"0.0.0.0:{os.getenv('PORT', '5000')}"
+workers = int(os.getenv('WEB_CONCURRENCY', '2'))
+threads = int(os.getenv('GUNICORN_THREADS', '4'))
+
+if os.getenv('WRITE_BEHIND_ENABLED', '0') == '1' and workers > 1:
+    # Buffered writes live in one process's memory; other workers would serve stale reads
+    print(f"⚠️ WRITE_BEHIND_ENABLED needs a single worker process; running 1 instead of {workers}")
+    workers = 1
+
+worker_class = 'gthread'
+timeout = int(os.getenv('GUNICORN_TIMEOUT', '60'))
+graceful_timeout = int(os.getenv('GUNICORN_GRACEFUL_TIMEOUT', '30'))
+keepalive = 5
+
+# Import the app (schema setup, catalog preload, journal replay) once in the
+# master; workers fork from it and share the loaded catalog copy-on-write
+preload_app = True
+
+accesslog = '-'
+errorlog = '-'
+
+
+def post_fork(server, worker):
+    """Give each worker its own database connections, write-behind flusher and job pool"""
+    from src.main import app, db
+    from src.services.jobs import jobs
+    from src.services.write_behind import write_behind
+
+    with app.app_context():
+        # Connections opened by the master must not be shared across processes
+        for engine in db.engines.values():
+            engine.dispose(close=False)
+    write_behind.after_fork()
+    jobs.after_fork()
+
+
+def worker_exit(server, worker):
+    """Flush buffered writes before a worker goes away; unfinished jobs are failed by the next startup"""
+    from src.services.jobs import jobs
+    from src.services.write_behind import write_behind
+
+    jobs.shutdown()
+
+    if write_behind.enabled:
+        try:
+            write_behind.flush()
+        except Exception as e:
+            print(f"❌ Write-behind flush on shutdown failed: {str(e)}")
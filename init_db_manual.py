@@ -5,10 +5,15 @@ Manual database initialization script using Python requests
 
 import requests
 import sys
+import time
 
 # Backend URL from AGENTS.md
 BACKEND_URL = "https://web-production-e17b.up.railway.app"
 
+# The re-seed runs as a background job; poll its status until it finishes
+POLL_INTERVAL = 2
+POLL_TIMEOUT = 300
+
 def check_health():
     """Check if the backend is healthy and get word count"""
     try:
@@ -27,20 +32,37 @@ def check_health():
         print(f"❌ Failed to connect to backend: {str(e)}")
         return None
 
+def wait_for_job(status_url):
+    """Poll a background job until it succeeds or fails; returns the final job"""
+    deadline = time.time() + POLL_TIMEOUT
+    while time.time() < deadline:
+        response = requests.get(f"{BACKEND_URL}{status_url}", timeout=30)
+        response.raise_for_status()
+        job = response.json()
+        if job.get('status') in ('succeeded', 'failed'):
+            return job
+        print(f"   ⏳ Job {job.get('id')} is {job.get('status')}...")
+        time.sleep(POLL_INTERVAL)
+    raise TimeoutError(f"Job did not finish within {POLL_TIMEOUT} seconds")
+
 def initialize_database():
-    """Initialize the database by calling the init-db endpoint"""
+    """Initialize the database by starting the re-seed job and waiting for it"""
     try:
         print("🔄 Initializing database with 200 words...")
-        response = requests.post(f"{BACKEND_URL}/api/init-db", timeout=120)
+        response = requests.post(f"{BACKEND_URL}/api/init-db", timeout=30)
         
-        if response.status_code == 200:
-            data = response.json()
-            print(f"✅ {data.get('message', 'Database initialized successfully')}")
-            return True
-        else:
+        if response.status_code != 202:
             print(f"❌ Database initialization failed: {response.status_code}")
             print(response.text)
             return False
+
+        job = wait_for_job(response.json()['status_url'])
+        if job['status'] == 'succeeded':
+            print(f"✅ Database initialized: {job.get('result')}")
+            return True
+        else:
+            print(f"❌ Database initialization failed: {job.get('error')}")
+            return False
     except Exception as e:
         print(f"❌ Failed to initialize database: {str(e)}")
         return False
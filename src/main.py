@@ -4,63 +4,128 @@ import sys
 # Ensure src/ is in the path
 sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
 
-from flask import Flask, send_from_directory, jsonify
+from contextlib import contextmanager
+
+import click
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as ProbeTimeout
+from datetime import datetime
+from flask import Blueprint, Flask, current_app, send_from_directory, jsonify
+from sqlalchemy import text
 from flask_cors import CORS
 from src.models.user import db
 from src.models.word import Word, UserWordProgress, TestResult
+from src.models.job import Job
+from src.models.migrations import upgrade_schema
 from src.routes.user import user_bp
 from src.routes.word import word_bp
+from src.routes.job import job_bp, accepted
+from src.services.catalog import catalog
+from src.services.database import configure_engine, engine_options_from_env, pool_stats
+from src.services.instrumentation import instrumentation
+from src.services.jobs import jobs
+from src.services.query_log import query_inspector
+from src.services.replicas import replicas
+from src.services.word_import import import_words
+from src.services.write_behind import write_behind
+
+DEFAULT_SQLITE_URL = "sqlite:///word_adventure.db"
+
+# Postgres advisory lock key held while one process creates the schema and seeds
+STARTUP_LOCK_KEY = 7267001
+
+# How long /api/health/ready waits for SELECT 1 before reporting not ready
+READINESS_TIMEOUT = int(os.getenv('READINESS_TIMEOUT_MS', '2000')) / 1000
+
+# When this process last (re)seeded the word table, for the readiness report
+last_seeded_at = None
+
+def database_url_from_env():
+    """DATABASE_URL normalized for SQLAlchemy, or the local SQLite fallback"""
+    database_url = os.getenv("DATABASE_URL")
+
+    if not database_url:
+        print("❌ DATABASE_URL environment variable not found!")
+        # Fallback to SQLite for local development
+        database_url = DEFAULT_SQLITE_URL
+        print("🔄 Using SQLite fallback database")
+
+    if database_url and database_url.startswith("postgres://"):
+        database_url = database_url.replace("postgres://", "postgresql://", 1)
+
+    return database_url
 
-# Create Flask app
-app = Flask(__name__, static_folder=os.path.join(os.path.dirname(__file__), 'static'))
-app.config['SECRET_KEY'] = 'asdf#FGSgvasgf$5$WGT'
+def create_app(config=None):
+    """Build the Flask app. Does no database I/O; see initialize_database() and the CLI commands."""
+    app = Flask(__name__, static_folder=os.path.join(os.path.dirname(__file__), 'static'))
+    app.config['SECRET_KEY'] = 'asdf#FGSgvasgf$5$WGT'
+    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    app.config.update(config or {})
 
-# ✅ Allow only your Netlify frontend
-CORS(app, origins=["https://words-adventure.netlify.app"], supports_credentials=True)
+    if 'SQLALCHEMY_DATABASE_URI' not in app.config:
+        app.config['SQLALCHEMY_DATABASE_URI'] = database_url_from_env()
+    if 'SQLALCHEMY_ENGINE_OPTIONS' not in app.config:
+        # Pool sizing, pre-ping/recycle and statement timeout from DB_* variables
+        app.config['SQLALCHEMY_ENGINE_OPTIONS'] = engine_options_from_env(app.config['SQLALCHEMY_DATABASE_URI'])
 
-# Register Blueprints
-app.register_blueprint(user_bp, url_prefix='/api')
-app.register_blueprint(word_bp, url_prefix='/api')
+    # ✅ Allow only your Netlify frontend
+    CORS(app, origins=["https://words-adventure.netlify.app"], supports_credentials=True)
 
-# Configure PostgreSQL database from environment
-database_url = os.getenv("DATABASE_URL")
+    # Register Blueprints
+    app.register_blueprint(user_bp, url_prefix='/api')
+    app.register_blueprint(word_bp, url_prefix='/api')
+    app.register_blueprint(job_bp, url_prefix='/api')
+    app.register_blueprint(main_bp)
 
-if not database_url:
-    print("❌ DATABASE_URL environment variable not found!")
-    # Fallback to SQLite for local development
-    database_url = "sqlite:///word_adventure.db"
-    print("🔄 Using SQLite fallback database")
+    # Optional read replicas (DATABASE_REPLICA_URLS); adds binds, so before db.init_app
+    replicas.init_app(app)
 
-if database_url and database_url.startswith("postgres://"):
-    database_url = database_url.replace("postgres://", "postgresql://", 1)
+    # Initialize database
+    db.init_app(app)
+    with app.app_context():
+        engines = list(db.engines.values())
+    for engine in engines:
+        configure_engine(engine)
 
-app.config['SQLALCHEMY_DATABASE_URI'] = database_url
-app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    # Server-Timing headers and GET /metrics (METRICS_ENABLED=0 to disable)
+    instrumentation.init_app(app, engines)
 
-# Initialize database
-db.init_app(app)
+    # Slow-query log and N+1 warnings (QUERY_LOG=dev|sampled)
+    query_inspector.init_app(app, engines)
+
+    # Optional buffered writes for progress/XP updates (WRITE_BEHIND_ENABLED=1)
+    write_behind.init_app(app)
+
+    # Background jobs for reseeding, bulk imports and stats recomputation
+    jobs.init_app(app)
+
+    register_commands(app)
+    return app
 
 def seed_database(force_reseed=False):
-    """Seed the database with 200 comprehensive words if empty or force re-seed"""
+    """Seed the database with the comprehensive word list if empty or force re-seed"""
+    global last_seeded_at
     print("Attempting to seed database...")
     try:
         if force_reseed:
             print("Force re-seeding: Deleting existing words...")
             db.session.query(Word).delete()
             db.session.commit()
+            catalog.invalidate()
             print("Existing words deleted.")
 
         if Word.query.count() == 0 or force_reseed:
             # Import the comprehensive 200-word dataset
-            from data.words_200 import words_data
+            from src.data.words_200 import words_data
             
             print(f"Adding {len(words_data)} words to database...")
-            for word_data in words_data:
-                word = Word(**word_data)
-                db.session.add(word)
+            created, errors = import_words(words_data, returning=False)
+            for error in errors:
+                print(f"❌ Skipped seed word: {error}")
 
             db.session.commit()
-            print(f"✅ Database seeded with {len(words_data)} comprehensive words!")
+            catalog.invalidate()
+            last_seeded_at = datetime.utcnow()
+            print(f"✅ Database seeded with {len(created)} comprehensive words!")
             return True
         else:
             print("✅ Database already contains words")
@@ -70,61 +135,167 @@ def seed_database(force_reseed=False):
         db.session.rollback()
         return False
 
-# Initialize database with app context
-with app.app_context():
-    try:
-        db.create_all()
+@contextmanager
+def startup_lock():
+    """Serialize schema creation and seeding across processes (Postgres advisory lock)"""
+    if db.engine.dialect.name != 'postgresql':
+        yield
+        return
+
+    with db.engine.connect() as conn:
+        conn.execute(text('SELECT pg_advisory_lock(:key)'), {'key': STARTUP_LOCK_KEY})
+        try:
+            yield
+        finally:
+            conn.execute(text('SELECT pg_advisory_unlock(:key)'), {'key': STARTUP_LOCK_KEY})
+
+def initialize_database(seed=True):
+    """Create missing tables, apply schema upgrades and seed an empty word table, once under a lock"""
+    with startup_lock():
+        # The primary only: replicas get the schema through replication
+        db.create_all(bind_key=None)
         print("✅ Database tables created successfully")
-        seed_database()
-    except Exception as e:
-        print(f"❌ Database initialization error: {str(e)}")
+        applied = upgrade_schema()
+        if applied:
+            print(f"✅ Schema upgraded: {', '.join(applied)}")
+        if seed:
+            return seed_database()
+        return True
+
+@jobs.handler('reseed')
+def reseed_job(params):
+    """Create/upgrade the schema, then delete and re-seed all words"""
+    initialize_database(seed=False)
+    if not seed_database(force_reseed=True):
+        raise RuntimeError('Database seeding failed')
+    return {'word_count': Word.query.count()}
+
+def startup(app):
+    """One-time process startup for servers: database setup, write-behind recovery and flusher"""
+    with app.app_context():
+        try:
+            if os.getenv('AUTO_INIT_DB', '1') == '1':
+                initialize_database()
+            write_behind.recover()
+            interrupted = jobs.recover()
+            if interrupted:
+                print(f"🔄 Marked {interrupted} interrupted background jobs as failed")
+        except Exception as e:
+            print(f"❌ Database initialization error: {str(e)}")
+    write_behind.start()
+
+def register_commands(app):
+    @app.cli.command('init-db')
+    @click.option('--no-seed', is_flag=True, help='Only create and upgrade the schema')
+    def init_db_command(no_seed):
+        """Create tables, apply schema upgrades and seed words if the table is empty."""
+        if not initialize_database(seed=not no_seed):
+            raise SystemExit(1)
+
+    @app.cli.command('seed')
+    @click.option('--force', is_flag=True, help='Delete existing words and re-seed')
+    def seed_command(force):
+        """Seed the word table (only when empty unless --force)."""
+        if not seed_database(force_reseed=force):
+            raise SystemExit(1)
+
+main_bp = Blueprint('main', __name__)
 
 # Health check route
-@app.route('/api/health', methods=['GET'])
+@main_bp.route('/api/health', methods=['GET'])
 def health_check():
+    # The same bounded SELECT 1 as readiness, so 'database' reports a check that actually ran
+    database, error, latency_ms = probe_database()
+    if error:
+        return {
+            'status': 'unhealthy',
+            'message': 'Database connection failed',
+            'database': database,
+            'error': error
+        }, 503
     try:
-        # Test database connection
-        word_count = Word.query.count()
+        # Loads the catalog at most once per TTL instead of counting the table per probe
+        word_count = len(catalog.snapshot().words)
         return {
             'status': 'healthy', 
             'message': 'Word Adventure API is running!',
-            'database': 'connected',
-            'word_count': word_count
+            'database': database,
+            'database_latency_ms': latency_ms,
+            'word_count': word_count,
+            'database_pool': pool_stats(db.engine),
+            'replica_pools': {key: pool_stats(db.engines[key]) for key in replicas.bind_keys},
+            'catalog_cache': catalog.stats(),
+            'write_behind': write_behind.stats(),
+            'query_log': query_inspector.stats()
         }, 200
     except Exception as e:
         return {
             'status': 'unhealthy',
-            'message': 'Database connection failed',
+            'message': 'Failed to load the word catalog',
             'error': str(e)
         }, 500
 
-# Database initialization endpoint (for manual seeding)
-@app.route('/api/init-db', methods=['POST'])
+# Liveness: the process is up and serving requests; no I/O
+@main_bp.route('/api/health/live', methods=['GET'])
+def health_live():
+    return {'status': 'alive'}, 200
+
+# One probe at a time; a hung probe makes the next ones time out too, which is the right answer
+_probe_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='readiness')
+
+def _probe_database(app):
+    with app.app_context():
+        with db.engine.connect() as conn:
+            conn.execute(text('SELECT 1'))
+
+def probe_database():
+    """SELECT 1 under READINESS_TIMEOUT; returns (state, error or None, latency in ms)"""
+    started = datetime.utcnow()
+    try:
+        _probe_executor.submit(_probe_database, current_app._get_current_object()).result(READINESS_TIMEOUT)
+        database, error = 'connected', None
+    except ProbeTimeout:
+        database, error = 'timeout', f'SELECT 1 took longer than {READINESS_TIMEOUT}s'
+    except Exception as e:
+        database, error = 'unavailable', str(e)
+    return database, error, round((datetime.utcnow() - started).total_seconds() * 1000, 3)
+
+# Readiness: the database answers quickly; reports cached state without recounting anything
+@main_bp.route('/api/health/ready', methods=['GET'])
+def health_ready():
+    database, error, latency_ms = probe_database()
+    cache = catalog.stats()
+    body = {
+        'status': 'ready' if error is None else 'not_ready',
+        'database': database,
+        'database_latency_ms': latency_ms,
+        'database_pool': pool_stats(db.engine),
+        'catalog_version': cache['version'],
+        'word_count': cache['word_count'],
+        'last_seeded_at': last_seeded_at.isoformat() if last_seeded_at else None
+    }
+    if error:
+        body['error'] = error
+    return body, 200 if error is None else 503
+
+# Database initialization endpoint (for manual seeding); poll the returned job for completion
+@main_bp.route('/api/init-db', methods=['POST'])
 def init_database():
     try:
-        db.create_all()
-        success = seed_database(force_reseed=True) # Force re-seed on manual trigger
-        if success:
-            return {
-                'status': 'success',
-                'message': 'Database initialized and seeded successfully'
-            }, 200
-        else:
-            return {
-                'status': 'error',
-                'message': 'Database seeding failed'
-            }, 500
+        # Force re-seed on manual trigger; a reseed already in flight is returned instead of a second one
+        return accepted(jobs.submit('reseed', dedupe=True))
     except Exception as e:
+        db.session.rollback()
         return {
             'status': 'error',
             'message': f'Database initialization failed: {str(e)}'
         }, 500
 
 # Serve static files (optional)
-@app.route('/', defaults={'path': ''})
-@app.route('/<path:path>')
+@main_bp.route('/', defaults={'path': ''})
+@main_bp.route('/<path:path>')
 def serve(path):
-    static_folder_path = app.static_folder
+    static_folder_path = current_app.static_folder
     if not static_folder_path:
         return "Static folder not configured", 404
 
@@ -139,8 +310,11 @@ def serve(path):
     
     return "index.html not found", 404
 
+app = create_app()
+
 # For local testing only
 if __name__ == '__main__':
+    startup(app)
     port = int(os.environ.get('PORT', 5000))
     app.run(host='0.0.0.0', port=port, debug=False)
 
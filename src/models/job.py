@@ -0,0 +1,45 @@
+from datetime import datetime
+import json
+
+from src.models.user import db
+
+class Job(db.Model):
+    """A background job run by the in-process job runner (src/services/jobs.py)"""
+    __table_args__ = (
+        db.Index('ix_job_kind_status', 'kind', 'status'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    kind = db.Column(db.String(50), nullable=False)
+    status = db.Column(db.String(20), nullable=False, default='queued')  # queued, running, succeeded, failed
+    params = db.Column(db.Text, default='{}')  # Handler arguments as JSON
+    result = db.Column(db.Text)  # Handler return value as JSON
+    error = db.Column(db.Text)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    started_at = db.Column(db.DateTime)
+    finished_at = db.Column(db.DateTime)
+    owner = db.Column(db.String(120))  # host:pid of the process that queued or runs the job
+    heartbeat_at = db.Column(db.DateTime)  # refreshed by the owner while the job is active
+
+    ACTIVE_STATUSES = ('queued', 'running')
+
+    def __repr__(self):
+        return f'<Job {self.id} {self.kind} {self.status}>'
+
+    def get_params(self):
+        return json.loads(self.params) if self.params else {}
+
+    def get_result(self):
+        return json.loads(self.result) if self.result else None
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'kind': self.kind,
+            'status': self.status,
+            'result': self.get_result(),
+            'error': self.error,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'started_at': self.started_at.isoformat() if self.started_at else None,
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None
+        }
@@ -0,0 +1,82 @@
+"""
+Lightweight schema upgrades for databases created before a model change.
+
+db.create_all() only creates missing tables, so columns and indexes added to
+existing models are applied here. Only additive changes are supported.
+"""
+
+from sqlalchemy import inspect, text
+
+from src.models.user import db
+
+
+def _column_default_sql(column):
+    default = column.default
+    if default is None or not default.is_scalar:
+        return ''
+    value = default.arg
+    if isinstance(value, bool):
+        value = int(value)
+    if isinstance(value, str):
+        value = "'" + value.replace("'", "''") + "'"
+    return f' DEFAULT {value}'
+
+
+def _merge_duplicate_word_progress(conn):
+    """Fold duplicate (user_id, word_id) progress rows into the newest one before the unique index is built"""
+    conn.execute(text('''
+        UPDATE user_word_progress SET
+            attempts = (SELECT SUM(d.attempts) FROM user_word_progress d
+                        WHERE d.user_id = user_word_progress.user_id AND d.word_id = user_word_progress.word_id),
+            correct_attempts = (SELECT SUM(d.correct_attempts) FROM user_word_progress d
+                                WHERE d.user_id = user_word_progress.user_id AND d.word_id = user_word_progress.word_id)
+        WHERE id IN (SELECT MAX(id) FROM user_word_progress GROUP BY user_id, word_id HAVING COUNT(*) > 1)
+    '''))
+    conn.execute(text('''
+        DELETE FROM user_word_progress
+        WHERE id NOT IN (SELECT MAX(id) FROM user_word_progress GROUP BY user_id, word_id)
+    '''))
+    conn.execute(text('''
+        UPDATE user_word_progress SET mastery_level = CAST(correct_attempts AS FLOAT) / attempts
+        WHERE attempts > 0
+    '''))
+
+
+# Data fixes that must run before an index can be created on existing rows
+BEFORE_INDEX = {
+    'uq_user_word_progress_user_word': _merge_duplicate_word_progress,
+}
+
+
+def upgrade_schema():
+    """Add missing columns and indexes to existing tables; returns a list of applied changes"""
+    applied = []
+    inspector = inspect(db.engine)
+    existing_tables = set(inspector.get_table_names())
+
+    for table in db.metadata.sorted_tables:
+        if table.name not in existing_tables:
+            continue
+
+        existing_columns = {column['name'] for column in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name in existing_columns:
+                continue
+            column_type = column.type.compile(dialect=db.engine.dialect)
+            with db.engine.begin() as conn:
+                conn.execute(text(
+                    f'ALTER TABLE "{table.name}" ADD COLUMN "{column.name}" {column_type}'
+                    f'{_column_default_sql(column)}'
+                ))
+            applied.append(f'{table.name}.{column.name}')
+
+        existing_indexes = {index['name'] for index in inspector.get_indexes(table.name)}
+        for index in table.indexes:
+            if index.name not in existing_indexes:
+                if index.name in BEFORE_INDEX:
+                    with db.engine.begin() as conn:
+                        BEFORE_INDEX[index.name](conn)
+                index.create(db.engine)
+                applied.append(index.name)
+
+    return applied
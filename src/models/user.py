@@ -1,9 +1,52 @@
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy.dialects.postgresql import ARRAY, JSONB, array
 from werkzeug.security import generate_password_hash, check_password_hash
 from datetime import datetime
 import json
 
-db = SQLAlchemy()
+from src.services.replicas import RoutingSession
+
+# Sessions route @replica_reads views to a read replica when DATABASE_REPLICA_URLS is set
+db = SQLAlchemy(session_options={'class_': RoutingSession})
+
+def merge_patch(target, patch):
+    """Apply an RFC 7386 JSON merge patch: objects merge recursively, null deletes, anything else replaces"""
+    if not isinstance(patch, dict):
+        return patch
+
+    result = dict(target) if isinstance(target, dict) else {}
+    for key, value in patch.items():
+        if value is None:
+            result.pop(key, None)
+        else:
+            result[key] = merge_patch(result.get(key), value)
+    return result
+
+def merge_patch_sql(target, patch):
+    """merge_patch() as a Postgres expression over the jsonb expression target.
+
+    Only the patch is sent as parameters: deleted keys are removed with `-`,
+    replaced keys merged in with `||` and nested objects patched with jsonb_set.
+    """
+    if not isinstance(patch, dict):
+        return db.cast(db.literal(json.dumps(patch)), JSONB)
+
+    result = db.case((db.func.jsonb_typeof(target) == 'object', target), else_=db.cast(db.literal('{}'), JSONB))
+    removed = [key for key, value in patch.items() if value is None]
+    replaced = {key: value for key, value in patch.items() if value is not None and not isinstance(value, dict)}
+    if removed:
+        result = result.op('-', return_type=JSONB)(db.cast(array(removed), ARRAY(db.Text)))
+    if replaced:
+        result = result.op('||', return_type=JSONB)(db.cast(db.literal(json.dumps(replaced)), JSONB))
+    for key, value in patch.items():
+        if isinstance(value, dict):
+            result = db.func.jsonb_set(
+                result,
+                db.cast(array([key]), ARRAY(db.Text)),
+                merge_patch_sql(target.op('->', return_type=JSONB)(key), value),
+                type_=JSONB
+            )
+    return result
 
 class User(db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -38,69 +81,80 @@ class User(db.Model):
         """Check if the provided password matches the hash"""
         return check_password_hash(self.password_hash, password)
 
-    def get_progress_data(self):
-        """Get progress data as Python dict"""
+    def _get_json(self, field, default):
+        """Parse a JSON text column, caching the result until the raw text changes.
+
+        The returned value is shared with the cache; copy it before mutating.
+        """
+        raw = getattr(self, field)
+        cache = self.__dict__.setdefault('_json_cache', {})
+        cached = cache.get(field)
+        if cached is not None and cached[0] == raw:
+            return cached[1]
+
         try:
-            return json.loads(self.progress_data) if self.progress_data else {}
+            value = json.loads(raw) if raw else default
         except:
-            return {}
+            value = default
+        cache[field] = (raw, value)
+        return value
+
+    def _set_json(self, field, data):
+        raw = json.dumps(data)
+        setattr(self, field, raw)
+        self.__dict__.setdefault('_json_cache', {})[field] = (raw, data)
+
+    def get_progress_data(self):
+        """Get progress data as Python dict"""
+        return self._get_json('progress_data', {})
 
     def set_progress_data(self, data):
         """Set progress data from Python dict"""
-        self.progress_data = json.dumps(data)
+        self._set_json('progress_data', data)
 
     def get_settings(self):
         """Get settings as Python dict"""
-        try:
-            return json.loads(self.settings) if self.settings else {}
-        except:
-            return {}
+        return self._get_json('settings', {})
 
     def set_settings(self, data):
         """Set settings from Python dict"""
-        self.settings = json.dumps(data)
+        self._set_json('settings', data)
 
     def get_achievements(self):
         """Get achievements as Python list"""
-        try:
-            return json.loads(self.achievements) if self.achievements else []
-        except:
-            return []
+        return self._get_json('achievements', [])
 
     def set_achievements(self, data):
         """Set achievements from Python list"""
-        self.achievements = json.dumps(data)
+        self._set_json('achievements', data)
 
     def get_virtual_pet(self):
         """Get virtual pet data as Python dict"""
-        try:
-            return json.loads(self.virtual_pet) if self.virtual_pet else {}
-        except:
-            return {}
+        return self._get_json('virtual_pet', {})
 
     def set_virtual_pet(self, data):
         """Set virtual pet data from Python dict"""
-        self.virtual_pet = json.dumps(data)
-
-    def to_dict(self, include_sensitive=False):
-        """Convert user to dictionary for API responses"""
-        user_dict = {
-            'id': self.id,
-            'username': self.username,
-            'email': self.email,
-            'created_at': self.created_at.isoformat() if self.created_at else None,
-            'last_login': self.last_login.isoformat() if self.last_login else None,
-            'level': self.level,
-            'xp': self.xp,
-            'words_learned': self.words_learned,
-            'current_streak': self.current_streak,
-            'best_streak': self.best_streak,
-            'total_tests_taken': self.total_tests_taken,
-            'progress_data': self.get_progress_data(),
-            'settings': self.get_settings(),
-            'achievements': self.get_achievements(),
-            'virtual_pet': self.get_virtual_pet()
-        }
+        self._set_json('virtual_pet', data)
+
+    # Fields to_dict() can return, in response order
+    DICT_FIELDS = (
+        'id', 'username', 'email', 'created_at', 'last_login', 'level', 'xp',
+        'words_learned', 'current_streak', 'best_streak', 'total_tests_taken',
+        'progress_data', 'settings', 'achievements', 'virtual_pet'
+    )
+    JSON_FIELDS = ('progress_data', 'settings', 'achievements', 'virtual_pet')
+
+    def _dict_value(self, field):
+        if field in self.JSON_FIELDS:
+            return getattr(self, f'get_{field}')()
+        value = getattr(self, field)
+        if isinstance(value, datetime):
+            return value.isoformat()
+        return value
+
+    def to_dict(self, include_sensitive=False, fields=None):
+        """Convert user to dictionary for API responses, optionally only the given fields"""
+        user_dict = {field: self._dict_value(field) for field in (fields or self.DICT_FIELDS)}
         
         if include_sensitive:
             user_dict['password_hash'] = self.password_hash
@@ -15,10 +15,23 @@ class Word(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
+    __table_args__ = (
+        db.Index('ix_word_word', 'word'),
+        db.Index('ix_word_category_difficulty', 'category', 'difficulty'),
+        db.Index('ix_word_difficulty', 'difficulty'),
+    )
+
     def __repr__(self):
         return f'<Word {self.word}>'
 
-    def to_dict(self):
+    def to_dict(self, fields=None):
+        """Convert word to dictionary, optionally only the given fields (which need not all be loaded otherwise)"""
+        if fields is not None:
+            word_dict = {}
+            for field in fields:
+                value = getattr(self, field)
+                word_dict[field] = value.isoformat() if isinstance(value, datetime) else value
+            return word_dict
         return {
             'id': self.id,
             'word': self.word,
@@ -44,10 +57,35 @@ class UserWordProgress(db.Model):
     correct_attempts = db.Column(db.Integer, default=0)
     last_practiced = db.Column(db.DateTime, default=datetime.utcnow)
     mastery_level = db.Column(db.Float, default=0.0)  # 0.0 to 1.0
+    box = db.Column(db.Integer, default=0)  # Leitner box, 0 = never practiced
+    due_at = db.Column(db.Integer, default=0)  # unix timestamp when the word is next due for review
+
+    __table_args__ = (
+        # Unique index rather than a table constraint so it can be added to existing tables
+        db.Index('uq_user_word_progress_user_word', 'user_id', 'word_id', unique=True),
+        db.Index('ix_user_word_progress_user_due', 'user_id', 'due_at'),
+    )
 
     def __repr__(self):
         return f'<UserWordProgress user_id={self.user_id} word_id={self.word_id}>'
 
+    # Above this many ids an IN list gets unwieldy, so load all of the user's rows instead
+    BULK_LOOKUP_LIMIT = 500
+
+    @classmethod
+    def for_words(cls, user_id, word_ids):
+        """Load a user's progress for many words in a single query, keyed by word_id"""
+        word_ids = list(word_ids)
+        if not word_ids:
+            return {}
+
+        query = cls.query.filter(cls.user_id == user_id)
+        if len(word_ids) <= cls.BULK_LOOKUP_LIMIT:
+            query = query.filter(cls.word_id.in_(word_ids))
+
+        wanted = set(word_ids)
+        return {progress.word_id: progress for progress in query.all() if progress.word_id in wanted}
+
     def to_dict(self):
         return {
             'id': self.id,
@@ -58,9 +96,23 @@ class UserWordProgress(db.Model):
             'correct_attempts': self.correct_attempts,
             'last_practiced': self.last_practiced.isoformat() if self.last_practiced else None,
             'mastery_level': self.mastery_level,
+            'box': self.box,
+            'due_at': datetime.utcfromtimestamp(self.due_at).isoformat() if self.due_at else None,
             'word': self.word.to_dict() if hasattr(self, 'word') and self.word else None
         }
 
+    def to_summary_dict(self):
+        """Compact form without the nested word, for batch responses"""
+        return {
+            'word_id': self.word_id,
+            'status': self.status,
+            'attempts': self.attempts,
+            'correct_attempts': self.correct_attempts,
+            'mastery_level': self.mastery_level,
+            'box': self.box,
+            'due_at': datetime.utcfromtimestamp(self.due_at).isoformat() if self.due_at else None
+        }
+
 class TestResult(db.Model):
     """Store quiz/test results"""
     id = db.Column(db.Integer, primary_key=True)
@@ -71,6 +123,10 @@ class TestResult(db.Model):
     time_taken = db.Column(db.Integer)  # in seconds
     completed_at = db.Column(db.DateTime, default=datetime.utcnow)
 
+    __table_args__ = (
+        db.Index('ix_test_result_user_completed', 'user_id', 'completed_at'),
+    )
+
     def __repr__(self):
         return f'<TestResult user_id={self.user_id} score={self.score}/{self.total_questions}>'
 
@@ -0,0 +1,52 @@
+from flask import Blueprint, jsonify, request, url_for
+from flask_cors import cross_origin
+from src.models.job import Job, db
+from src.services import analytics  # registers the recompute_stats handler
+from src.services.jobs import jobs
+
+job_bp = Blueprint('job', __name__)
+
+def accepted(job):
+    """202 response pointing the client at the job's status resource"""
+    status_url = url_for('job.get_job', job_id=job.id)
+    response = jsonify({'status': 'accepted', 'job': job.to_dict(), 'status_url': status_url})
+    response.status_code = 202
+    response.headers['Location'] = status_url
+    return response
+
+@job_bp.route('/jobs/<int:job_id>', methods=['GET'])
+@cross_origin()
+def get_job(job_id):
+    """Poll a background job's status and result"""
+    job = db.session.get(Job, job_id)
+    if job is None:
+        return jsonify({'error': 'Job not found'}), 404
+    return jsonify(job.to_dict())
+
+@job_bp.route('/jobs', methods=['GET'])
+@cross_origin()
+def get_jobs():
+    """Most recent jobs first, optionally filtered by kind and status"""
+    try:
+        limit = min(max(request.args.get('limit', 20, type=int), 1), 100)
+        query = Job.query
+        if request.args.get('kind'):
+            query = query.filter(Job.kind == request.args['kind'])
+        if request.args.get('status'):
+            query = query.filter(Job.status == request.args['status'])
+        return jsonify([job.to_dict() for job in query.order_by(Job.id.desc()).limit(limit)])
+    except Exception as e:
+        return jsonify({'error': 'Failed to fetch jobs', 'details': str(e)}), 500
+
+@job_bp.route('/jobs/recompute-stats', methods=['POST'])
+@cross_origin()
+def recompute_stats():
+    """Rebuild users' total_tests_taken from their test results in the background"""
+    try:
+        data = request.get_json(silent=True) or {}
+        user_ids = data.get('user_ids')
+        # A full recompute already in flight covers this one
+        return accepted(jobs.submit('recompute_stats', {'user_ids': user_ids}, dedupe=not user_ids))
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': 'Failed to start job', 'details': str(e)}), 500
@@ -1,7 +1,18 @@
 from flask import Blueprint, jsonify, request
 from flask_cors import cross_origin
-from src.models.user import User, db
-from src.models.word import UserWordProgress, TestResult
+from src.models.user import User, db, merge_patch, merge_patch_sql
+from src.models.word import TestResult, Word
+from src.services.catalog import catalog
+from src.services import scheduler
+from src.services.progress import record_answers
+from src.services.pagination import (
+    InvalidCursor, STREAM_BATCH_SIZE, decode_cursor, encode_cursor, ndjson_response, page_size, wants_ndjson
+)
+from src.services.projection import InvalidFields, parse_user_fields, user_columns
+from src.services.replicas import replica_reads
+from src.services.write_behind import write_behind
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import load_only
 from datetime import datetime
 import re
 
@@ -16,6 +27,78 @@ def validate_password(password):
     """Password validation - at least 6 characters"""
     return len(password) >= 6
 
+def progress_changes(data):
+    """User fields to change for a progress update, clamped to valid values"""
+    changes = {}
+    if 'xp' in data:
+        changes['xp'] = max(0, data['xp'])
+    if 'level' in data:
+        changes['level'] = max(1, data['level'])
+    if 'words_learned' in data:
+        changes['words_learned'] = max(0, data['words_learned'])
+    if 'current_streak' in data:
+        changes['current_streak'] = max(0, data['current_streak'])
+        changes['best_streak'] = changes['current_streak']
+    for field in ('progress_data', 'virtual_pet', 'settings', 'achievements'):
+        if field in data:
+            changes[field] = data[field]
+    return changes
+
+def apply_progress_changes(user, changes):
+    """Apply progress_changes() to a loaded user"""
+    for field, value in changes.items():
+        if field == 'best_streak':
+            user.best_streak = max(user.best_streak or 0, value)
+        elif field == 'progress_data':
+            user.set_progress_data(value)
+        elif field == 'virtual_pet':
+            user.set_virtual_pet(value)
+        elif field == 'settings':
+            user.set_settings(value)
+        elif field == 'achievements':
+            user.set_achievements(value)
+        else:
+            setattr(user, field, value)
+
+def progress_patch_values(changes):
+    """UPDATE values for progress_changes() with JSON fields as merge patches, merged by Postgres"""
+    values = {}
+    for field, value in changes.items():
+        if field == 'best_streak':
+            values[field] = db.case(
+                (db.func.coalesce(User.best_streak, 0) < value, value),
+                else_=User.best_streak
+            )
+        elif field in User.JSON_FIELDS:
+            stored = db.cast(getattr(User, field), JSONB)
+            values[field] = db.cast(merge_patch_sql(stored, value), db.Text)
+        else:
+            values[field] = value
+    return values
+
+def answer_error(answer):
+    """Why an answer ({word_id, status, correct}) is malformed, or None if it is well-formed"""
+    if not isinstance(answer, dict):
+        return 'answer must be an object'
+    word_id = answer.get('word_id')
+    if not word_id:
+        return 'word_id is required'
+    if not isinstance(word_id, int) or isinstance(word_id, bool):
+        return 'word_id must be an integer'
+    if not isinstance(answer.get('status', 'unknown'), str):
+        return 'status must be a string'
+    if not isinstance(answer.get('correct', False), bool):
+        return 'correct must be true or false'
+    return None
+
+def missing_word_ids(word_ids):
+    """Those of word_ids without a word, checked against the database rather than
+    this worker's catalog snapshot, which can be minutes old"""
+    if not word_ids:
+        return []
+    found = set(db.session.scalars(db.select(Word.id).where(Word.id.in_(set(word_ids)))))
+    return sorted(set(word_ids) - found)
+
 @user_bp.route('/auth/register', methods=['POST'])
 @cross_origin()
 def register():
@@ -112,19 +195,29 @@ def login():
         
         return jsonify({
             'message': 'Login successful',
-            'user': user.to_dict()
+            'user': write_behind.user_dict(user)
         }), 200
         
     except Exception as e:
         return jsonify({'error': 'Login failed', 'details': str(e)}), 500
 
 @user_bp.route('/users/<int:user_id>', methods=['GET'])
+@replica_reads
 @cross_origin()
 def get_user(user_id):
     """Get user profile"""
     try:
-        user = User.query.get_or_404(user_id)
-        return jsonify(user.to_dict()), 200
+        fields = parse_user_fields(request.args.get('fields'))
+        query = User.query
+        if fields:
+            query = query.options(load_only(*user_columns(fields)))
+        
+        user = query.filter_by(id=user_id).first()
+        if not user:
+            return jsonify({'error': 'User not found'}), 404
+        return jsonify(write_behind.user_dict(user, fields)), 200
+    except InvalidFields as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': 'Failed to get user', 'details': str(e)}), 500
 
@@ -134,26 +227,16 @@ def update_user_progress(user_id):
     """Update user progress data"""
     try:
         user = User.query.get_or_404(user_id)
-        data = request.json
+        changes = progress_changes(request.json)
         
-        if 'xp' in data:
-            user.xp = max(0, data['xp'])
-        if 'level' in data:
-            user.level = max(1, data['level'])
-        if 'words_learned' in data:
-            user.words_learned = max(0, data['words_learned'])
-        if 'current_streak' in data:
-            user.current_streak = max(0, data['current_streak'])
-            user.best_streak = max(user.best_streak, user.current_streak)
-        if 'progress_data' in data:
-            user.set_progress_data(data['progress_data'])
-        if 'virtual_pet' in data:
-            user.set_virtual_pet(data['virtual_pet'])
-        if 'settings' in data:
-            user.set_settings(data['settings'])
-        if 'achievements' in data:
-            user.set_achievements(data['achievements'])
+        if write_behind.enabled:
+            write_behind.update_user(user_id, changes)
+            return jsonify({
+                'message': 'Progress update queued',
+                'user': write_behind.user_dict(user)
+            }), 200
         
+        apply_progress_changes(user, changes)
         db.session.commit()
         
         return jsonify({
@@ -165,52 +248,122 @@ def update_user_progress(user_id):
         db.session.rollback()
         return jsonify({'error': 'Failed to update progress', 'details': str(e)}), 500
 
+@user_bp.route('/users/<int:user_id>/progress', methods=['PATCH'])
+@cross_origin()
+def patch_user_progress(user_id):
+    """Partially update user progress; JSON fields take an RFC 7386 merge patch of only the changed keys"""
+    try:
+        data = request.get_json(force=True)
+        if not isinstance(data, dict):
+            return jsonify({'error': 'Patch must be a JSON object'}), 400
+        
+        changes = progress_changes(data)
+        
+        if not write_behind.enabled and db.engine.dialect.name == 'postgresql':
+            # One UPDATE merging the patch into the stored JSON; the blobs never leave the database
+            patched = db.session.execute(
+                db.update(User)
+                .where(User.id == user_id)
+                .values(**progress_patch_values(changes))
+                .returning(User.id)
+            ).scalar()
+            if patched is None:
+                return jsonify({'error': 'User not found'}), 404
+            db.session.commit()
+        else:
+            # Lock the row so concurrent patches merge onto each other
+            user = User.query.filter_by(id=user_id).with_for_update().first()
+            if not user:
+                return jsonify({'error': 'User not found'}), 404
+            
+            merged = dict(changes)
+            current = write_behind.user_dict(user) if write_behind.enabled else None
+            for field in User.JSON_FIELDS:
+                if field in changes:
+                    base = current[field] if current else getattr(user, f'get_{field}')()
+                    merged[field] = merge_patch(base, changes[field])
+            
+            if write_behind.enabled:
+                write_behind.update_user(user_id, merged)
+            else:
+                apply_progress_changes(user, merged)
+                db.session.commit()
+        
+        # Only echo the applied patch instead of the whole profile
+        return jsonify({
+            'message': 'Progress patched successfully',
+            'changes': changes
+        }), 200
+        
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': 'Failed to patch progress', 'details': str(e)}), 500
+
 @user_bp.route('/users/<int:user_id>/word-progress', methods=['POST'])
 @cross_origin()
 def update_word_progress(user_id):
     """Update progress for a specific word"""
     try:
         data = request.json
-        word_id = data.get('word_id')
-        status = data.get('status', 'unknown')
-        correct = data.get('correct', False)
-        
-        if not word_id:
-            return jsonify({'error': 'word_id is required'}), 400
         
-        # Find or create word progress record
-        progress = UserWordProgress.query.filter_by(
-            user_id=user_id, 
-            word_id=word_id
-        ).first()
+        # Checked up front: a malformed answer must never reach the write-behind buffer
+        error = answer_error(data)
+        if error:
+            return jsonify({'error': error}), 400
         
-        if not progress:
-            progress = UserWordProgress(user_id=user_id, word_id=word_id)
-            db.session.add(progress)
-        
-        # Update progress
-        progress.status = status
-        progress.attempts += 1
-        progress.last_practiced = datetime.utcnow()
+        word_id = data['word_id']
+        status = data.get('status', 'unknown')
+        correct = data.get('correct', False)
+        if missing_word_ids([word_id]):
+            return jsonify({'error': 'Word not found'}), 404
         
-        if correct:
-            progress.correct_attempts += 1
+        if write_behind.enabled:
+            write_behind.add_answer(user_id, {'word_id': word_id, 'status': status, 'correct': correct})
+            return jsonify({'message': 'Word progress queued'}), 202
         
-        # Calculate mastery level
-        if progress.attempts > 0:
-            progress.mastery_level = progress.correct_attempts / progress.attempts
+        # Single-statement upsert: no read-modify-write race between concurrent answers
+        progress = record_answers(user_id, [{
+            'word_id': word_id,
+            'status': status,
+            'correct': correct
+        }])[0]
+        progress_dict = progress.to_dict()
         
         db.session.commit()
         
         return jsonify({
             'message': 'Word progress updated',
-            'progress': progress.to_dict()
+            'progress': progress_dict
         }), 200
         
     except Exception as e:
         db.session.rollback()
         return jsonify({'error': 'Failed to update word progress', 'details': str(e)}), 500
 
+@user_bp.route('/users/<int:user_id>/next-words', methods=['GET'])
+@cross_origin()
+def get_next_words(user_id):
+    """Get the words a user should practice next (due reviews first, then new words)"""
+    try:
+        count = max(0, min(request.args.get('count', 10, type=int), 100))
+        snapshot = catalog.snapshot()
+        write_behind.flush_user(user_id)
+        
+        word_list = []
+        for word_id, progress in scheduler.next_words(user_id, count, snapshot):
+            word = snapshot.get(word_id)
+            if not word:
+                continue
+            
+            word_dict = dict(word)
+            word_dict['user_progress'] = progress.to_dict() if progress else None
+            word_list.append(word_dict)
+        
+        return jsonify(word_list), 200
+        
+    except Exception as e:
+        return jsonify({'error': 'Failed to get next words', 'details': str(e)}), 500
+
 @user_bp.route('/users/<int:user_id>/test-results', methods=['POST'])
 @cross_origin()
 def save_test_result(user_id):
@@ -244,7 +397,81 @@ def save_test_result(user_id):
         db.session.rollback()
         return jsonify({'error': 'Failed to save test result', 'details': str(e)}), 500
 
+@user_bp.route('/users/<int:user_id>/sessions', methods=['POST'])
+@cross_origin()
+def save_session(user_id):
+    """Save a whole quiz session (answer log plus test summary) in one transaction"""
+    try:
+        data = request.json or {}
+        if not isinstance(data, dict):
+            return jsonify({'error': 'Session must be a JSON object'}), 400
+        answers = data.get('answers', [])
+        test = data.get('test')
+        
+        if not answers and not test:
+            return jsonify({'error': 'answers or test is required'}), 400
+        if not isinstance(answers, list):
+            return jsonify({'error': 'answers must be a list'}), 400
+        if test is not None and not isinstance(test, dict):
+            return jsonify({'error': 'test must be an object'}), 400
+        
+        for i, answer in enumerate(answers):
+            error = answer_error(answer)
+            if error:
+                return jsonify({'error': f'Answer {i+1}: {error}'}), 400
+        
+        if db.session.query(User.id).filter_by(id=user_id).first() is None:
+            return jsonify({'error': 'User not found'}), 404
+        missing = missing_word_ids([answer['word_id'] for answer in answers])
+        if missing:
+            return jsonify({'error': 'Word not found', 'word_ids': missing}), 404
+        
+        # Answers still buffered from earlier requests land first, in their own transaction
+        write_behind.flush_user(user_id)
+        
+        # One upsert statement for every answered word
+        progress_rows = record_answers(user_id, answers)
+        
+        result = None
+        total_tests_taken = None
+        if test is not None:
+            result = TestResult(
+                user_id=user_id,
+                test_type=test.get('test_type', 'quiz'),
+                score=test.get('score', sum(1 for answer in answers if answer.get('correct'))),
+                total_questions=test.get('total_questions', len(answers)),
+                time_taken=test.get('time_taken')
+            )
+            db.session.add(result)
+            
+            total_tests_taken = db.session.execute(
+                db.update(User)
+                .where(User.id == user_id)
+                .values(total_tests_taken=db.func.coalesce(User.total_tests_taken, 0) + 1)
+                .returning(User.total_tests_taken)
+            ).scalar()
+        
+        db.session.flush()
+        
+        # Compact delta: only the fields the client needs to refresh its state.
+        # Built before commit so the rows are not expired and reloaded.
+        payload = {
+            'message': 'Session saved',
+            'progress': [progress.to_summary_dict() for progress in progress_rows],
+            'result': result.to_dict() if result else None,
+            'total_tests_taken': total_tests_taken
+        }
+        
+        db.session.commit()
+        
+        return jsonify(payload), 201
+        
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': 'Failed to save session', 'details': str(e)}), 500
+
 @user_bp.route('/users/<int:user_id>/test-results', methods=['GET'])
+@replica_reads
 @cross_origin()
 def get_test_results(user_id):
     """Get user's test results"""
@@ -259,11 +486,40 @@ def get_test_results(user_id):
         return jsonify({'error': 'Failed to get test results', 'details': str(e)}), 500
 
 @user_bp.route('/users', methods=['GET'])
+@replica_reads
 @cross_origin()
 def get_users():
-    """Get all users (admin function)"""
+    """Get all users (admin function), with keyset pagination on id or NDJSON streaming"""
     try:
-        users = User.query.all()
-        return jsonify([user.to_dict() for user in users]), 200
+        fields = parse_user_fields(request.args.get('fields'))
+        limit = page_size(request.args.get('limit', type=int))
+        cursor = decode_cursor(request.args.get('cursor'), (int,))
+        
+        query = User.query
+        if fields:
+            query = query.options(load_only(*user_columns(fields)))
+        if cursor:
+            query = query.filter(User.id > cursor[0])
+        query = query.order_by(User.id)
+        
+        if wants_ndjson(request):
+            users = query.yield_per(STREAM_BATCH_SIZE)
+            return ndjson_response(write_behind.user_dict(user, fields) for user in users)
+        
+        next_cursor = None
+        if limit:
+            users = query.limit(limit + 1).all()
+            if len(users) > limit:
+                users = users[:limit]
+                next_cursor = encode_cursor([users[-1].id])
+        else:
+            users = query.all()
+        
+        response = jsonify([write_behind.user_dict(user, fields) for user in users])
+        if next_cursor:
+            response.headers['X-Next-Cursor'] = next_cursor
+        return response, 200
+    except (InvalidFields, InvalidCursor) as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': 'Failed to get users', 'details': str(e)}), 500
@@ -2,11 +2,85 @@ from flask import Blueprint, jsonify, request
 from flask_cors import cross_origin
 from src.models.word import Word, UserWordProgress, db
 from src.models.user import User
+from src.routes.job import accepted
+from src.services.catalog import catalog
+from src.services.http_cache import conditional_response, encoded_json_response
+from src.services.jobs import jobs
+from src.services.pagination import (
+    InvalidCursor, STREAM_BATCH_SIZE, batched, decode_cursor, keyset_page, ndjson_response, page_size, wants_ndjson
+)
+from src.services.projection import InvalidFields, parse_word_fields, project, word_columns
+from src.services.replicas import replica_reads, replicas
+from src.services.word_import import import_words, iter_csv_rows, iter_ndjson_rows, stream_import
+from src.services.write_behind import write_behind
+from sqlalchemy.orm import load_only
 from datetime import datetime
 
 word_bp = Blueprint('word', __name__)
 
+UNKNOWN_PROGRESS = {
+    'status': 'unknown',
+    'attempts': 0,
+    'correct_attempts': 0,
+    'mastery_level': 0.0
+}
+
+def attach_user_progress(word_dicts, user_id, include_unknown=False):
+    """Copy serialized words with the user's progress, loaded in one query instead of one per word"""
+    word_ids = [word['id'] for word in word_dicts]
+    if write_behind.flush_user(user_id):
+        # Just written to the primary; a replica may not have it yet
+        with replicas.primary():
+            progress_by_word = UserWordProgress.for_words(user_id, word_ids)
+    else:
+        progress_by_word = UserWordProgress.for_words(user_id, word_ids)
+
+    word_list = []
+    for word in word_dicts:
+        word_dict = dict(word)
+        progress = progress_by_word.get(word['id'])
+
+        if progress:
+            word_dict['user_progress'] = progress.to_dict()
+        elif include_unknown:
+            word_dict['user_progress'] = dict(UNKNOWN_PROGRESS)
+
+        word_list.append(word_dict)
+
+    return word_list
+
+def word_sort_key(word):
+    return (word['word'], word['id'])
+
+def stream_words(category, difficulty, cursor, fields, user_id):
+    """Yield serialized words straight from the database in (word, id) order, batch by batch"""
+    query = Word.query
+    if fields:
+        # Only the requested columns leave the database
+        query = query.options(load_only(*word_columns(fields)))
+    
+    if category and category != 'all':
+        query = query.filter(Word.category == category)
+    
+    if difficulty and difficulty != 'all':
+        query = query.filter(Word.difficulty == difficulty)
+    
+    if cursor:
+        last_word, last_id = cursor
+        query = query.filter(db.or_(
+            Word.word > last_word,
+            db.and_(Word.word == last_word, Word.id > last_id)
+        ))
+    
+    rows = query.order_by(Word.word, Word.id).yield_per(STREAM_BATCH_SIZE)
+    for batch in batched(rows):
+        words = [word.to_dict(fields=fields) for word in batch]
+        if user_id:
+            words = attach_user_progress(words, user_id, include_unknown=True)
+        yield from words
+
 @word_bp.route('/words', methods=['GET'])
+@replica_reads
 @cross_origin()
 def get_words():
     """Get all words with optional filtering"""
@@ -14,57 +88,67 @@ def get_words():
         # Get query parameters
         category = request.args.get('category')
         difficulty = request.args.get('difficulty')
-        user_id = request.args.get('user_id')
+        user_id = request.args.get('user_id', type=int)
+        if user_id is None and request.args.get('user_id'):
+            return jsonify({'error': 'user_id must be an integer'}), 400
+        fields = parse_word_fields(request.args.get('fields'))
+        limit = page_size(request.args.get('limit', type=int))
+        cursor = decode_cursor(request.args.get('cursor'), (str, int))
         
-        # Build query
-        query = Word.query
+        # Streaming mode reads the table in batches instead of the in-memory catalog
+        if wants_ndjson(request):
+            return ndjson_response(stream_words(category, difficulty, cursor, fields, user_id))
         
-        if category and category != 'all':
-            query = query.filter(Word.category == category)
+        snapshot = catalog.snapshot()
+        words = snapshot.filter(category, difficulty)
         
-        if difficulty and difficulty != 'all':
-            query = query.filter(Word.difficulty == difficulty)
-        
-        words = query.order_by(Word.word).all()
+        # Keyset pagination over the (word, id) ordering
+        if limit or cursor:
+            words, next_cursor = keyset_page(words, word_sort_key, cursor, limit)
+            words = [project(word, fields) for word in words]
+            if user_id:
+                words = attach_user_progress(words, user_id, include_unknown=True)
+            response = jsonify(words)
+            if next_cursor:
+                response.headers['X-Next-Cursor'] = next_cursor
+            return response, 200
         
         # If user_id is provided, include user progress
         if user_id:
-            word_list = []
-            for word in words:
-                word_dict = word.to_dict()
-                
-                # Get user progress for this word
-                progress = UserWordProgress.query.filter_by(
-                    user_id=user_id, 
-                    word_id=word.id
-                ).first()
-                
-                if progress:
-                    word_dict['user_progress'] = progress.to_dict()
-                else:
-                    word_dict['user_progress'] = {
-                        'status': 'unknown',
-                        'attempts': 0,
-                        'correct_attempts': 0,
-                        'mastery_level': 0.0
-                    }
-                
-                word_list.append(word_dict)
-            
-            return jsonify(word_list), 200
+            words = [project(word, fields) for word in words]
+            return jsonify(attach_user_progress(words, user_id, include_unknown=True)), 200
+        elif not snapshot.has_filter(category, difficulty):
+            # Unknown filter values match nothing; not memoized, so arbitrary values cannot grow the cache
+            return jsonify([]), 200
         else:
-            return jsonify([word.to_dict() for word in words]), 200
+            shape = ('words', category or 'all', difficulty or 'all', ','.join(fields or ['*']))
+            return conditional_response(
+                snapshot.etag(*shape),
+                lambda: encoded_json_response(
+                    snapshot.encoded(shape, lambda: [project(word, fields) for word in words])
+                )
+            )
             
+    except (InvalidFields, InvalidCursor) as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': 'Failed to get words', 'details': str(e)}), 500
 
 @word_bp.route('/words/<int:word_id>', methods=['GET'])
+@replica_reads
 @cross_origin()
 def get_word(word_id):
     """Get a specific word"""
     try:
-        word = Word.query.get_or_404(word_id)
-        return jsonify(word.to_dict()), 200
+        snapshot = catalog.snapshot()
+        word = snapshot.get(word_id)
+        if not word:
+            return jsonify({'error': 'Word not found'}), 404
+        shape = ('word', word_id)
+        return conditional_response(
+            snapshot.etag(*shape),
+            lambda: encoded_json_response(snapshot.encoded(shape, lambda: word))
+        )
     except Exception as e:
         return jsonify({'error': 'Failed to get word', 'details': str(e)}), 500
 
@@ -101,6 +185,7 @@ def create_word():
         
         db.session.add(word)
         db.session.commit()
+        catalog.add_words([word.to_dict()])
         
         return jsonify({
             'message': 'Word created successfully',
@@ -114,7 +199,7 @@ def create_word():
 @word_bp.route('/words/bulk', methods=['POST'])
 @cross_origin()
 def create_words_bulk():
-    """Create multiple words from CSV data"""
+    """Create multiple words from CSV data; with ?async=1 the import runs as a background job"""
     try:
         data = request.json
         words_data = data.get('words', [])
@@ -122,43 +207,16 @@ def create_words_bulk():
         if not words_data:
             return jsonify({'error': 'No words data provided'}), 400
         
-        created_words = []
-        errors = []
+        if request.args.get('async') == '1':
+            return accepted(jobs.submit('import_words', {'words': words_data}))
         
-        for i, word_data in enumerate(words_data):
-            try:
-                # Validate required fields
-                if not word_data.get('word') or not word_data.get('definition'):
-                    errors.append(f"Row {i+1}: Word and definition are required")
-                    continue
-                
-                # Check if word already exists
-                existing_word = Word.query.filter_by(word=word_data['word'].lower()).first()
-                if existing_word:
-                    errors.append(f"Row {i+1}: Word '{word_data['word']}' already exists")
-                    continue
-                
-                # Create word
-                word = Word(
-                    word=word_data['word'].lower(),
-                    pronunciation=word_data.get('pronunciation'),
-                    definition=word_data['definition'],
-                    example=word_data.get('example'),
-                    fun_fact=word_data.get('fun_fact'),
-                    image_url=word_data.get('image_url'),
-                    emoji=word_data.get('emoji'),
-                    category=word_data.get('category', 'general'),
-                    difficulty=word_data.get('difficulty', 'medium')
-                )
-                
-                db.session.add(word)
-                created_words.append(word_data['word'])
-                
-            except Exception as e:
-                errors.append(f"Row {i+1}: {str(e)}")
+        # One existence query and one insert per chunk instead of per row
+        new_words, errors = import_words(words_data)
+        created_words = [word['word'] for word in new_words]
         
-        if created_words:
+        if new_words:
             db.session.commit()
+            catalog.add_words(new_words)
         
         return jsonify({
             'message': f'Bulk import completed',
@@ -172,29 +230,76 @@ def create_words_bulk():
         db.session.rollback()
         return jsonify({'error': 'Bulk import failed', 'details': str(e)}), 500
 
+@jobs.handler('import_words')
+def import_words_job(params):
+    new_words, errors = import_words(params['words'])
+    db.session.commit()
+    if new_words:
+        catalog.add_words(new_words)
+    return {
+        'created': len(new_words),
+        'errors': len(errors),
+        'error_details': errors
+    }
+
+@word_bp.route('/words/import', methods=['POST'])
+@cross_origin()
+def import_words_stream():
+    """Import words from a streamed CSV or NDJSON upload, reporting progress as NDJSON"""
+    try:
+        upload_format = request.args.get('format') or request.mimetype
+        if upload_format in ('csv', 'text/csv'):
+            rows = iter_csv_rows(request.stream)
+        elif upload_format in ('ndjson', 'application/x-ndjson', 'application/jsonl'):
+            rows = iter_ndjson_rows(request.stream)
+        else:
+            return jsonify({'error': 'Upload must be text/csv or application/x-ndjson'}), 415
+        
+        def reports():
+            # Parsing happens lazily here, one chunk at a time, while the response streams
+            try:
+                for report in stream_import(rows):
+                    yield report
+            finally:
+                catalog.invalidate()
+        
+        return ndjson_response(reports())
+        
+    except Exception as e:
+        return jsonify({'error': 'Import failed', 'details': str(e)}), 500
+
 @word_bp.route('/categories', methods=['GET'])
+@replica_reads
 @cross_origin()
 def get_categories():
     """Get all word categories"""
     try:
-        categories = db.session.query(Word.category).distinct().all()
-        category_list = [cat[0] for cat in categories]
-        return jsonify(category_list), 200
+        snapshot = catalog.snapshot()
+        shape = ('categories',)
+        return conditional_response(
+            snapshot.etag(*shape),
+            lambda: encoded_json_response(snapshot.encoded(shape, lambda: snapshot.categories))
+        )
     except Exception as e:
         return jsonify({'error': 'Failed to get categories', 'details': str(e)}), 500
 
 @word_bp.route('/difficulties', methods=['GET'])
+@replica_reads
 @cross_origin()
 def get_difficulties():
     """Get all difficulty levels"""
     try:
-        difficulties = db.session.query(Word.difficulty).distinct().all()
-        difficulty_list = [diff[0] for diff in difficulties]
-        return jsonify(difficulty_list), 200
+        snapshot = catalog.snapshot()
+        shape = ('difficulties',)
+        return conditional_response(
+            snapshot.etag(*shape),
+            lambda: encoded_json_response(snapshot.encoded(shape, lambda: snapshot.difficulties))
+        )
     except Exception as e:
         return jsonify({'error': 'Failed to get difficulties', 'details': str(e)}), 500
 
 @word_bp.route('/words/random', methods=['GET'])
+@replica_reads
 @cross_origin()
 def get_random_words():
     """Get random words for quizzes"""
@@ -202,64 +307,71 @@ def get_random_words():
         count = request.args.get('count', 10, type=int)
         category = request.args.get('category')
         difficulty = request.args.get('difficulty')
-        user_id = request.args.get('user_id')
+        user_id = request.args.get('user_id', type=int)
+        if user_id is None and request.args.get('user_id'):
+            return jsonify({'error': 'user_id must be an integer'}), 400
+        seed = request.args.get('seed', type=int)
+        fields = parse_word_fields(request.args.get('fields'))
         
-        # Build query
-        query = Word.query
-        
-        if category and category != 'all':
-            query = query.filter(Word.category == category)
-        
-        if difficulty and difficulty != 'all':
-            query = query.filter(Word.difficulty == difficulty)
-        
-        # Get random words
-        words = query.order_by(db.func.random()).limit(count).all()
+        words = catalog.snapshot().sample(count, category, difficulty, seed=seed)
+        words = [project(word, fields) for word in words]
         
         # Include user progress if user_id provided
         if user_id:
-            word_list = []
-            for word in words:
-                word_dict = word.to_dict()
-                
-                progress = UserWordProgress.query.filter_by(
-                    user_id=user_id, 
-                    word_id=word.id
-                ).first()
-                
-                if progress:
-                    word_dict['user_progress'] = progress.to_dict()
-                
-                word_list.append(word_dict)
-            
-            return jsonify(word_list), 200
+            return jsonify(attach_user_progress(words, user_id)), 200
         else:
-            return jsonify([word.to_dict() for word in words]), 200
+            return jsonify(words), 200
             
+    except InvalidFields as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': 'Failed to get random words', 'details': str(e)}), 500
 
+@word_bp.route('/words/suggest', methods=['GET'])
+@replica_reads
+@cross_origin()
+def suggest_words():
+    """Autocomplete words starting with a prefix"""
+    try:
+        prefix = request.args.get('prefix', '').strip()
+        limit = max(1, min(request.args.get('limit', 10, type=int), 50))
+        category = request.args.get('category')
+        difficulty = request.args.get('difficulty')
+        
+        if not prefix:
+            return jsonify([]), 200
+        
+        words = catalog.snapshot().suggest_index.complete(prefix, limit, category, difficulty)
+        
+        return jsonify([{
+            'id': word['id'],
+            'word': word['word'],
+            'emoji': word['emoji'],
+            'category': word['category'],
+            'difficulty': word['difficulty']
+        } for word in words]), 200
+        
+    except Exception as e:
+        return jsonify({'error': 'Suggest failed', 'details': str(e)}), 500
+
 @word_bp.route('/words/search', methods=['GET'])
+@replica_reads
 @cross_origin()
 def search_words():
-    """Search words by term"""
+    """Search words by term, ranked, with limit/offset pagination"""
     try:
         search_term = request.args.get('q', '').strip()
+        limit = max(1, min(request.args.get('limit', 50, type=int), 100))
+        offset = max(0, request.args.get('offset', 0, type=int))
         
         if not search_term:
             return jsonify([]), 200
         
-        # Search in word, definition, and example
-        words = Word.query.filter(
-            db.or_(
-                Word.word.contains(search_term.lower()),
-                Word.definition.contains(search_term),
-                Word.example.contains(search_term)
-            )
-        ).order_by(Word.word).limit(50).all()
+        total, words = catalog.snapshot().search_index.search(search_term, offset=offset, limit=limit)
         
-        return jsonify([word.to_dict() for word in words]), 200
+        response = jsonify(words)
+        response.headers['X-Total-Count'] = str(total)
+        return response, 200
         
     except Exception as e:
         return jsonify({'error': 'Search failed', 'details': str(e)}), 500
-
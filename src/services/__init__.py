@@ -0,0 +1 @@
+# Service layer for Word Adventure
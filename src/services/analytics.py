@@ -0,0 +1,37 @@
+"""
+Recomputation of the per-user counters stored on User.
+
+total_tests_taken is incremented as test results come in;
+recompute_user_stats() rebuilds it from the test_result table in one
+UPDATE, e.g. after a bulk data fix or a write-behind journal that was
+replayed twice.
+
+words_learned is left alone: the client maintains it through the progress
+endpoints by its own rules, which a count of 'known' progress rows does
+not reproduce.
+"""
+
+from src.models.user import User, db
+from src.models.word import TestResult
+from src.services.jobs import jobs
+
+
+def recompute_user_stats(user_ids=None):
+    """Rebuild total_tests_taken; returns the number of users updated"""
+    tests_taken = (
+        db.select(db.func.count(TestResult.id))
+        .where(TestResult.user_id == User.id)
+        .scalar_subquery()
+    )
+
+    update = db.update(User).values(total_tests_taken=tests_taken)
+    if user_ids:
+        update = update.where(User.id.in_(user_ids))
+    return db.session.execute(update).rowcount
+
+
+@jobs.handler('recompute_stats')
+def recompute_stats_job(params):
+    updated = recompute_user_stats(params.get('user_ids'))
+    db.session.commit()
+    return {'users_updated': updated}
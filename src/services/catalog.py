@@ -0,0 +1,271 @@
+"""
+In-process snapshot of the word catalog.
+
+Words almost never change, so read endpoints are served from a serialized
+snapshot instead of querying and re-serializing the table on every request.
+Writers call catalog.invalidate() after committing, which bumps the catalog
+version; the next read rebuilds the snapshot once. Writers that only add
+words can call catalog.add_words() instead, which derives the next snapshot
+in memory without going back to the database.
+"""
+
+import bisect
+import copy
+import hashlib
+import os
+import random
+import threading
+import time
+
+from src.models.word import Word
+from src.services import json_codec
+from src.services.http_cache import EncodedBody
+from src.services.replicas import replicas
+from src.services.search import SearchIndex
+from src.services.suggest import SuggestIndex
+
+
+def word_key(word):
+    """Sort key of the catalog order: by word, then id"""
+    return (word['word'], word['id'])
+
+
+class CatalogSnapshot:
+    """Immutable view of the serialized words, indexed for the read endpoints"""
+
+    def __init__(self, version, word_dicts, suggest_index=None):
+        self.version = version
+        self.loaded_at = time.time()
+        self.words = sorted(word_dicts, key=word_key)
+        self._keys = [word_key(word) for word in self.words]
+        self.by_id = {}
+        self.by_category = {}
+        self.by_difficulty = {}
+        # word ids per (category, difficulty) bucket, with None as the wildcard,
+        # so random sampling never has to look at the whole catalog
+        self._sample_buckets = {}
+
+        for word in self.words:
+            self.by_id[word['id']] = word
+            self.by_category.setdefault(word['category'], []).append(word)
+            self.by_difficulty.setdefault(word['difficulty'], []).append(word)
+            for bucket in self._buckets(word):
+                self._sample_buckets.setdefault(bucket, []).append(word['id'])
+
+        self.categories = list(self.by_category)
+        self.difficulties = list(self.by_difficulty)
+        # Every word id in ascending order, for walking the catalog in insertion order
+        self.ids = sorted(self.by_id)
+        self._digest = None
+        self._encoded = {}
+        self._search_index = None
+        self._search_index_lock = threading.Lock()
+        self.suggest_index = suggest_index or SuggestIndex.build(self.words)
+
+    @staticmethod
+    def _buckets(word):
+        return ((word['category'], word['difficulty']), (word['category'], None),
+                (None, word['difficulty']), (None, None))
+
+    def with_words(self, version, word_dicts):
+        """Next snapshot with word_dicts added, derived without re-sorting or re-indexing.
+
+        Containers the new words touch are copied before they change, so
+        readers still holding this snapshot never see the new words; the
+        search and suggest indexes are extended the same way. The digest is
+        left to be computed on first use.
+        """
+        derived = copy.copy(self)
+        derived.version = version
+        derived.words = list(self.words)
+        derived._keys = list(self._keys)
+        derived.by_id = dict(self.by_id)
+        derived.by_category = dict(self.by_category)
+        derived.by_difficulty = dict(self.by_difficulty)
+        derived._sample_buckets = dict(self._sample_buckets)
+        derived.ids = list(self.ids)
+        copied = set()
+
+        def own(mapping, name, key):
+            # Copy a shared list the first time this derivation changes it
+            if (name, key) not in copied:
+                mapping[key] = list(mapping.get(key, ()))
+                copied.add((name, key))
+            return mapping[key]
+
+        for word in word_dicts:
+            key = word_key(word)
+            position = bisect.bisect_left(derived._keys, key)
+            derived._keys.insert(position, key)
+            derived.words.insert(position, word)
+            derived.by_id[word['id']] = word
+            bisect.insort(derived.ids, word['id'])
+            bisect.insort(own(derived.by_category, 'category', word['category']), word, key=word_key)
+            bisect.insort(own(derived.by_difficulty, 'difficulty', word['difficulty']), word, key=word_key)
+            for bucket in self._buckets(word):
+                # Keep catalog order so a seeded sample() draws the same words as after a full load
+                bisect.insort(own(derived._sample_buckets, 'sample', bucket), word['id'],
+                              key=lambda word_id: word_key(derived.by_id[word_id]))
+
+        # Same order a full rebuild gives: by each group's first word
+        derived.categories = sorted(derived.by_category, key=lambda c: word_key(derived.by_category[c][0]))
+        derived.difficulties = sorted(derived.by_difficulty, key=lambda d: word_key(derived.by_difficulty[d][0]))
+        derived._digest = None
+        derived._encoded = {}
+        derived._search_index = self._search_index.with_words(word_dicts) if self._search_index else None
+        derived._search_index_lock = threading.Lock()
+        derived.suggest_index = self.suggest_index.with_words(word_dicts)
+        return derived
+
+    @property
+    def digest(self):
+        """Content digest rather than the version counter, so every worker
+        process hands out the same ETag for the same catalog. Computed on
+        first use: only ETag-carrying responses need it."""
+        if self._digest is None:
+            self._digest = hashlib.sha1(json_codec.dumps(self.words, sort_keys=True)).hexdigest()
+        return self._digest
+
+    @property
+    def search_index(self):
+        """Full-text index over this snapshot, built once on first use.
+
+        The build takes seconds on a large catalog, so concurrent first
+        searches wait for one build instead of each running their own.
+        """
+        if self._search_index is None:
+            with self._search_index_lock:
+                if self._search_index is None:
+                    self._search_index = SearchIndex(self.words)
+        return self._search_index
+
+    def sample(self, count, category=None, difficulty=None, seed=None):
+        """Draw up to count distinct random words from a bucket.
+
+        Cost depends on count, not on the catalog size. Passing a seed makes
+        the draw reproducible for the same catalog.
+        """
+        if category == 'all':
+            category = None
+        if difficulty == 'all':
+            difficulty = None
+
+        ids = self._sample_buckets.get((category or None, difficulty or None), [])
+        rng = random.Random(seed) if seed is not None else random
+        chosen = rng.sample(ids, max(0, min(count, len(ids))))
+        return [self.by_id[word_id] for word_id in chosen]
+
+    def etag(self, *shape):
+        """Strong ETag for one response shape (endpoint plus its parameters) of this catalog"""
+        key = ':'.join([self.digest] + [str(part) for part in shape])
+        return hashlib.sha1(key.encode('utf-8')).hexdigest()
+
+    def encoded(self, shape, build):
+        """EncodedBody for a response shape, encoding build() only the first time it is asked for"""
+        body = self._encoded.get(shape)
+        if body is None:
+            body = self._encoded.setdefault(shape, EncodedBody(build()))
+        return body
+
+    def get(self, word_id):
+        """Get a serialized word by id, or None"""
+        return self.by_id.get(word_id)
+
+    def has_filter(self, category=None, difficulty=None):
+        """True if the category and difficulty filters name values in this catalog (None/'all' always do)"""
+        return (
+            category in (None, '', 'all') or category in self.by_category
+        ) and (
+            difficulty in (None, '', 'all') or difficulty in self.by_difficulty
+        )
+
+    def filter(self, category=None, difficulty=None):
+        """Words matching the optional category/difficulty filters, ordered by word"""
+        if category == 'all':
+            category = None
+        if difficulty == 'all':
+            difficulty = None
+
+        if category and difficulty:
+            words = self.by_category.get(category, [])
+            return [word for word in words if word['difficulty'] == difficulty]
+        if category:
+            return self.by_category.get(category, [])
+        if difficulty:
+            return self.by_difficulty.get(difficulty, [])
+        return self.words
+
+
+class CatalogCache:
+    """Versioned holder for the current CatalogSnapshot with hit/miss counters"""
+
+    def __init__(self, ttl=0):
+        # ttl bounds staleness when several worker processes each hold a copy;
+        # 0 means the snapshot only changes on invalidate()
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._version = 1
+        self._snapshot = None
+        self._lock = threading.Lock()
+
+    @property
+    def version(self):
+        return self._version
+
+    def _is_fresh(self, snapshot):
+        if snapshot is None or snapshot.version != self._version:
+            return False
+        return not self.ttl or time.time() - snapshot.loaded_at < self.ttl
+
+    def snapshot(self):
+        """Return the current snapshot, loading it from the database on a miss"""
+        snapshot = self._snapshot
+        if self._is_fresh(snapshot):
+            self.hits += 1
+            return snapshot
+
+        with self._lock:
+            snapshot = self._snapshot
+            if self._is_fresh(snapshot):
+                self.hits += 1
+                return snapshot
+
+            self.misses += 1
+            version = self._version
+            # Always from the primary: a lagging replica would be cached for the whole TTL
+            with replicas.primary():
+                snapshot = CatalogSnapshot(version, [word.to_dict() for word in Word.query.all()])
+            self._snapshot = snapshot
+            return snapshot
+
+    def add_words(self, word_dicts):
+        """Add newly committed words to the current snapshot, or invalidate if none is loaded"""
+        with self._lock:
+            snapshot = self._snapshot if self._is_fresh(self._snapshot) else None
+            self._version += 1
+            if snapshot is None:
+                self._snapshot = None
+                return
+
+            # Keeps loaded_at: still only as fresh as the database load it was derived from
+            self._snapshot = snapshot.with_words(self._version, list(word_dicts))
+
+    def invalidate(self):
+        """Mark the catalog as changed; call after committing word writes"""
+        with self._lock:
+            self._version += 1
+            self._snapshot = None
+
+    def stats(self):
+        snapshot = self._snapshot
+        return {
+            'version': self._version,
+            'digest': snapshot._digest if snapshot else None,
+            'hits': self.hits,
+            'misses': self.misses,
+            'word_count': len(snapshot.words) if snapshot else None
+        }
+
+
+catalog = CatalogCache(ttl=int(os.getenv('CATALOG_CACHE_TTL', '300')))
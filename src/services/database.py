@@ -0,0 +1,164 @@
+"""
+Engine configuration from the environment, and connection pool metrics.
+
+    DB_POOL_SIZE             connections kept open per process (default: 5)
+    DB_MAX_OVERFLOW          extra connections allowed under load (default: 10)
+    DB_POOL_TIMEOUT          seconds to wait for a free connection (default: 30)
+    DB_POOL_RECYCLE          seconds before a connection is replaced (default: 1800)
+    DB_POOL_PRE_PING         1 to test connections on checkout (default: 1)
+    DB_STATEMENT_TIMEOUT_MS  Postgres statement_timeout, 0 for none (default: 30000)
+    DB_PGBOUNCER             1 when DATABASE_URL points at PgBouncer in transaction mode (default: 0)
+
+The pool is per process: every gunicorn worker (WEB_CONCURRENCY, default 2)
+and every replica bind gets its own, so the primary can see up to
+workers x (DB_POOL_SIZE + DB_MAX_OVERFLOW) connections, 30 with the
+defaults. Size these against the database's max_connections.
+
+Pre-ping and recycle keep a managed Postgres restart from surfacing as a
+burst of stale-connection errors: a dead connection is detected and
+replaced on checkout instead of failing the request.
+
+PgBouncer in transaction mode rejects the `options` startup parameter and
+cannot keep session state or prepared statements across transactions, so
+in that mode the statement timeout is set with SET LOCAL at the start of
+each transaction and psycopg 3 is told not to prepare statements
+(psycopg2 never uses server-side prepared statements).
+"""
+
+import os
+import threading
+import time
+
+from sqlalchemy import event, exc
+from sqlalchemy.engine import make_url
+from sqlalchemy.pool import QueuePool
+
+
+def _env_int(name, default):
+    return int(os.getenv(name, str(default)))
+
+
+class PoolMetrics:
+    """Checkout counts and wait times for one pool"""
+
+    def __init__(self):
+        self.checkouts = 0
+        self.timeouts = 0
+        self.invalidations = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self._lock = threading.Lock()
+
+    def record_wait(self, seconds, timed_out=False):
+        with self._lock:
+            if timed_out:
+                self.timeouts += 1
+            else:
+                self.checkouts += 1
+            self.wait_total += seconds
+            self.wait_max = max(self.wait_max, seconds)
+
+    def record_invalidation(self):
+        with self._lock:
+            self.invalidations += 1
+
+    def to_dict(self):
+        with self._lock:
+            attempts = self.checkouts + self.timeouts
+            return {
+                'checkouts': self.checkouts,
+                'checkout_timeouts': self.timeouts,
+                'invalidated_connections': self.invalidations,
+                'wait_avg_ms': round(self.wait_total / attempts * 1000, 3) if attempts else 0.0,
+                'wait_max_ms': round(self.wait_max * 1000, 3)
+            }
+
+
+class MeteredQueuePool(QueuePool):
+    """QueuePool that records how long each checkout waited for a connection"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.metrics = PoolMetrics()
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except exc.TimeoutError:
+            self.metrics.record_wait(time.perf_counter() - start, timed_out=True)
+            raise
+        self.metrics.record_wait(time.perf_counter() - start)
+        return connection
+
+
+def _is_memory_sqlite(url):
+    return url.get_backend_name() == 'sqlite' and url.database in (None, '', ':memory:')
+
+
+def engine_options_from_env(database_url):
+    """SQLALCHEMY_ENGINE_OPTIONS for database_url, from the DB_* environment variables"""
+    url = make_url(database_url)
+    if _is_memory_sqlite(url):
+        # One shared in-memory database per thread; nothing to pool
+        return {}
+
+    options = {
+        'poolclass': MeteredQueuePool,
+        'pool_size': _env_int('DB_POOL_SIZE', 5),
+        'max_overflow': _env_int('DB_MAX_OVERFLOW', 10),
+        'pool_timeout': _env_int('DB_POOL_TIMEOUT', 30),
+        'pool_recycle': _env_int('DB_POOL_RECYCLE', 1800),
+        'pool_pre_ping': os.getenv('DB_POOL_PRE_PING', '1') == '1'
+    }
+
+    if url.get_backend_name() == 'postgresql':
+        connect_args = {}
+        statement_timeout = _env_int('DB_STATEMENT_TIMEOUT_MS', 30000)
+        if pgbouncer_mode():
+            if url.get_driver_name() == 'psycopg':
+                connect_args['prepare_threshold'] = None
+        elif statement_timeout:
+            connect_args['options'] = f'-c statement_timeout={statement_timeout}'
+        if connect_args:
+            options['connect_args'] = connect_args
+
+    return options
+
+
+def pgbouncer_mode():
+    return os.getenv('DB_PGBOUNCER', '0') == '1'
+
+
+def configure_engine(engine):
+    """Attach per-connection hooks that engine options alone cannot express"""
+    pool = engine.pool
+    if isinstance(pool, MeteredQueuePool):
+        @event.listens_for(engine, 'invalidate')
+        def count_invalidation(dbapi_connection, connection_record, exception):
+            engine.pool.metrics.record_invalidation()
+
+    statement_timeout = _env_int('DB_STATEMENT_TIMEOUT_MS', 30000)
+    if engine.dialect.name == 'postgresql' and pgbouncer_mode() and statement_timeout:
+        @event.listens_for(engine, 'begin')
+        def set_statement_timeout(conn):
+            # Transaction-scoped, so it never leaks to PgBouncer's next client
+            conn.exec_driver_sql(f'SET LOCAL statement_timeout = {statement_timeout}')
+
+
+def pool_stats(engine):
+    """Pool occupancy and checkout metrics for the health endpoint"""
+    pool = engine.pool
+    stats = {'pool': type(pool).__name__}
+    if isinstance(pool, QueuePool):
+        stats.update({
+            'size': pool.size(),
+            'checked_out': pool.checkedout(),
+            'checked_in': pool.checkedin(),
+            'overflow': pool.overflow(),
+            'timeout_s': pool.timeout()
+        })
+    metrics = getattr(pool, 'metrics', None)
+    if metrics is not None:
+        stats.update(metrics.to_dict())
+    return stats
@@ -0,0 +1,94 @@
+"""
+Conditional GET support (ETag / If-None-Match) and pre-encoded bodies for
+catalog responses
+"""
+
+import gzip
+import os
+
+from flask import Response, request
+
+from src.services import json_codec
+
+try:
+    import brotli
+except ImportError:  # brotli variants are optional
+    brotli = None
+
+# e.g. "public, max-age=60" or "no-cache" to force revalidation on every use
+CATALOG_CACHE_CONTROL = os.getenv('CATALOG_CACHE_CONTROL', 'public, max-age=60')
+
+# Bodies smaller than this are not worth compressing
+COMPRESS_MIN_SIZE = 1024
+
+
+class EncodedBody:
+    """A response body encoded to JSON once, with lazily built compressed variants"""
+
+    def __init__(self, obj):
+        self.identity = json_codec.dumps(obj)
+        self._variants = {}
+
+    def variant(self, encoding):
+        """Body bytes for a content coding ('br', 'gzip' or None for identity)"""
+        if encoding is None:
+            return self.identity
+        if encoding not in self._variants:
+            if encoding == 'br':
+                self._variants[encoding] = brotli.compress(self.identity, quality=5)
+            else:
+                self._variants[encoding] = gzip.compress(self.identity, compresslevel=6)
+        return self._variants[encoding]
+
+
+def negotiated_encoding():
+    """Content coding this request's Accept-Encoding gets for compressible bodies"""
+    accepted = request.accept_encodings
+    if brotli is not None and accepted['br']:
+        return 'br'
+    if accepted['gzip']:
+        return 'gzip'
+    return None
+
+
+def _choose_encoding(body):
+    if len(body.identity) < COMPRESS_MIN_SIZE:
+        return None
+    return negotiated_encoding()
+
+
+def encoded_json_response(body):
+    """Build a JSON response straight from an EncodedBody, compressed if the client allows it"""
+    encoding = _choose_encoding(body)
+    response = Response(body.variant(encoding), mimetype='application/json')
+    if encoding:
+        response.headers['Content-Encoding'] = encoding
+    response.headers['Vary'] = 'Accept-Encoding'
+    return response
+
+
+def conditional_response(etag, build_response):
+    """Answer 304 when the client already holds etag, otherwise build the full response.
+
+    build_response is only called on a cache miss, so a matching If-None-Match
+    skips serialization entirely.
+
+    A strong ETag has to differ between content-codings, so etag gets the
+    negotiated coding as a suffix. That is decided from Accept-Encoding
+    alone, without the body: a small body sent uncompressed to a gzip client
+    carries a "-gzip" tag, which is a distinct tag for identical bytes and
+    therefore still valid.
+    """
+    encoding = negotiated_encoding()
+    if encoding:
+        etag = f'{etag}-{encoding}'
+
+    if request.if_none_match.contains(etag):
+        response = Response(status=304)
+    else:
+        response = build_response()
+
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = CATALOG_CACHE_CONTROL
+    response.headers['Vary'] = 'Accept-Encoding'
+    return response
@@ -0,0 +1,298 @@
+"""
+Per-request instrumentation: wall time, database queries, JSON serialization
+and response size, per endpoint.
+
+Every response gets a Server-Timing header (app duration in milliseconds,
+plus db and ser when the request ran queries or encoded JSON) that browser
+dev tools display next to the request, and
+GET /metrics serves the aggregates in the Prometheus text format:
+
+    http_requests_total{endpoint,method,status}
+    http_request_duration_seconds{endpoint}       histogram
+    http_response_size_bytes{endpoint}            histogram
+    db_queries_total{endpoint}, db_query_duration_seconds_total{endpoint}
+    json_serialization_seconds_total{endpoint}
+
+Query time comes from before/after_cursor_execute events on every engine,
+serialization time from the app's JSON provider and json_codec.dumps().
+Streamed bodies (NDJSON) are measured up to the point streaming starts.
+A request that raises is recorded as a 500 from the got_request_exception
+signal, since an exception that propagates leaves no response for after_request.
+
+Metrics live in process memory, so each gunicorn worker reports its own;
+every series carries a pid label so Prometheus sees them as separate
+targets instead of counters that keep resetting. Set METRICS_ENABLED=0
+to turn all of this off.
+"""
+
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+
+from flask import Response, got_request_exception, request
+from flask.json.provider import DefaultJSONProvider
+from sqlalchemy import event
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+
+class RequestStats:
+    """What one request spent, accumulated while it runs"""
+
+    __slots__ = ('started', 'queries', 'db_time', 'serialization_time')
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.db_time = 0.0
+        self.serialization_time = 0.0
+
+
+# A ContextVar rather than flask.g: query events fire often and g costs an app-context lookup per access
+_request_stats = ContextVar('request_stats', default=None)
+
+
+def current_stats():
+    """The running request's RequestStats, or None outside an instrumented request"""
+    return _request_stats.get()
+
+
+def server_timing(duration, stats):
+    """Server-Timing header value; cached endpoints skip formatting db and ser entries they never spent"""
+    timing = 'app;dur=%.2f' % (duration * 1000)
+    if stats.queries:
+        timing += ', db;dur=%.2f;desc="%d queries"' % (stats.db_time * 1000, stats.queries)
+    if stats.serialization_time:
+        timing += ', ser;dur=%.2f' % (stats.serialization_time * 1000)
+    return timing
+
+
+def record_serialization(seconds):
+    stats = current_stats()
+    if stats is not None:
+        stats.serialization_time += seconds
+
+
+class Histogram:
+    __slots__ = ('counts', 'total')
+
+    def __init__(self, buckets):
+        self.counts = [0] * (len(buckets) + 1)
+        self.total = 0.0
+
+    @property
+    def count(self):
+        return sum(self.counts)
+
+    def merge(self, other):
+        self.counts = [a + b for a, b in zip(self.counts, other.counts)]
+        self.total += other.total
+
+
+class EndpointMetrics:
+    __slots__ = ('requests', 'duration', 'size', 'queries', 'db_time', 'serialization_time')
+
+    def __init__(self):
+        self.requests = 0
+        self.duration = Histogram(DURATION_BUCKETS)
+        self.size = Histogram(SIZE_BUCKETS)
+        self.queries = 0
+        self.db_time = 0.0
+        self.serialization_time = 0.0
+
+    def merge(self, other):
+        self.requests += other.requests
+        self.duration.merge(other.duration)
+        self.size.merge(other.size)
+        self.queries += other.queries
+        self.db_time += other.db_time
+        self.serialization_time += other.serialization_time
+
+
+class MetricsRegistry:
+    """Per-endpoint aggregates rendered as Prometheus text.
+
+    Each thread records into its own dict of series, keyed by (endpoint,
+    method, status), so a request takes no lock and does one lookup;
+    render() merges them. A scrape racing a request may see that request
+    partly recorded, which the next scrape corrects.
+    """
+
+    def __init__(self):
+        self._shards = []
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+    def _new_shard(self):
+        shard = self._local.series = {}
+        with self._lock:
+            self._shards.append(shard)
+        return shard
+
+    def record(self, endpoint, method, status, stats, duration, size):
+        try:
+            series = self._local.series
+        except AttributeError:
+            series = self._new_shard()
+
+        key = (endpoint, method, status)
+        metrics = series.get(key)
+        if metrics is None:
+            metrics = series[key] = EndpointMetrics()
+        metrics.requests += 1
+        # Histogram updates inlined: this runs once per request
+        histogram = metrics.duration
+        histogram.counts[bisect_left(DURATION_BUCKETS, duration)] += 1
+        histogram.total += duration
+        if size is not None:
+            histogram = metrics.size
+            histogram.counts[bisect_left(SIZE_BUCKETS, size)] += 1
+            histogram.total += size
+        metrics.queries += stats.queries
+        metrics.db_time += stats.db_time
+        metrics.serialization_time += stats.serialization_time
+
+    def _merged(self, group):
+        with self._lock:
+            shards = list(self._shards)
+        merged = {}
+        for series in shards:
+            for key, metrics in list(series.items()):
+                merged.setdefault(group(key), EndpointMetrics()).merge(metrics)
+        return merged
+
+    @property
+    def endpoints(self):
+        """EndpointMetrics per endpoint, merged across threads, methods and statuses"""
+        return self._merged(lambda key: key[0])
+
+    @property
+    def requests(self):
+        """Request counts per (endpoint, method, status), merged across threads"""
+        return {key: metrics.requests for key, metrics in self._merged(lambda key: key).items()}
+
+    def render(self):
+        pid = os.getpid()
+        endpoints = sorted(self.endpoints.items())
+        requests = sorted(self.requests.items())
+        lines = []
+
+        def histogram(name, help_text, buckets, attr):
+            lines.append(f'# HELP {name} {help_text}')
+            lines.append(f'# TYPE {name} histogram')
+            for endpoint, metrics in endpoints:
+                hist = getattr(metrics, attr)
+                labels = f'endpoint="{endpoint}",pid="{pid}"'
+                cumulative = 0
+                for bound, count in zip(buckets, hist.counts):
+                    cumulative += count
+                    lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}')
+                lines.append(f'{name}_bucket{{{labels},le="+Inf"}} {hist.count}')
+                lines.append(f'{name}_sum{{{labels}}} {hist.total}')
+                lines.append(f'{name}_count{{{labels}}} {hist.count}')
+
+        def counter(name, help_text, attr):
+            lines.append(f'# HELP {name} {help_text}')
+            lines.append(f'# TYPE {name} counter')
+            for endpoint, metrics in endpoints:
+                lines.append(f'{name}{{endpoint="{endpoint}",pid="{pid}"}} {getattr(metrics, attr)}')
+
+        lines.append('# HELP http_requests_total Requests handled, by endpoint, method and status')
+        lines.append('# TYPE http_requests_total counter')
+        for (endpoint, method, status), count in requests:
+            lines.append(
+                f'http_requests_total{{endpoint="{endpoint}",method="{method}",status="{status}",pid="{pid}"}} {count}'
+            )
+        histogram('http_request_duration_seconds', 'Wall time until the response is returned',
+                  DURATION_BUCKETS, 'duration')
+        histogram('http_response_size_bytes', 'Response body size, when known before streaming',
+                  SIZE_BUCKETS, 'size')
+        counter('db_queries_total', 'Database statements executed', 'queries')
+        counter('db_query_duration_seconds_total', 'Time spent executing database statements', 'db_time')
+        counter('json_serialization_seconds_total', 'Time spent encoding JSON', 'serialization_time')
+
+        return '\n'.join(lines) + '\n'
+
+
+class TimedJSONProvider(DefaultJSONProvider):
+    """Flask's JSON provider, adding its encoding time to the request's stats"""
+
+    def dumps(self, obj, **kwargs):
+        start = time.perf_counter()
+        try:
+            return super().dumps(obj, **kwargs)
+        finally:
+            record_serialization(time.perf_counter() - start)
+
+
+class Instrumentation:
+    def __init__(self):
+        self.enabled = False
+        self.registry = MetricsRegistry()
+
+    def init_app(self, app, engines):
+        """Hook requests, JSON encoding and the given engines, and add GET /metrics"""
+        self.enabled = os.getenv('METRICS_ENABLED', '1') == '1'
+        if not self.enabled:
+            return
+
+        app.json = TimedJSONProvider(app)
+        app.before_request(self._start)
+        app.after_request(self._finish)
+        # A signal rather than a teardown hook: it costs nothing on requests that do not raise
+        got_request_exception.connect(self._failed, app)
+        app.add_url_rule('/metrics', 'metrics', self.metrics_view, methods=['GET'])
+        for engine in engines:
+            self.instrument_engine(engine)
+
+    def instrument_engine(self, engine):
+        event.listen(engine, 'before_cursor_execute', _before_cursor_execute)
+        event.listen(engine, 'after_cursor_execute', _after_cursor_execute)
+
+    def _start(self):
+        _request_stats.set(RequestStats())
+
+    def _finish(self, response):
+        stats = _request_stats.get()
+        if stats is None:
+            return response
+        _request_stats.set(None)
+        req = request._get_current_object()
+
+        duration = time.perf_counter() - stats.started
+        response.headers.add('Server-Timing', server_timing(duration, stats))
+        # The header, not response.content_length, which re-parses and validates it
+        size = None if response.is_streamed else response.headers.get('Content-Length')
+        self.registry.record(req.endpoint or 'unmatched', req.method, response.status_code, stats, duration,
+                             int(size) if size else None)
+        return response
+
+    def _failed(self, sender, exception, **extra):
+        # Recorded here because when the exception propagates no response exists and _finish never runs
+        stats = _request_stats.get()
+        if stats is None:
+            return
+        _request_stats.set(None)
+        req = request._get_current_object()
+        duration = time.perf_counter() - stats.started
+        self.registry.record(req.endpoint or 'unmatched', req.method, 500, stats, duration, None)
+
+    def metrics_view(self):
+        return Response(self.registry.render(), mimetype='text/plain; version=0.0.4')
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info['query_start'] = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = current_stats()
+    if stats is not None:
+        stats.queries += 1
+        stats.db_time += time.perf_counter() - conn.info['query_start']
+
+
+instrumentation = Instrumentation()
@@ -0,0 +1,190 @@
+"""
+In-process background jobs for long-running admin operations.
+
+Jobs are rows in the job table, so any worker can answer a status poll for
+a job another worker is running. Handlers run on a small thread pool
+(JOB_WORKERS threads, default 2) inside their own app context and session;
+whatever a handler returns is stored as the job's JSON result, and an
+exception marks the job failed with its message.
+
+Handlers register by kind:
+
+    @jobs.handler('reseed')
+    def reseed(params):
+        ...
+        return {'words': 200}
+
+Jobs only live as long as the process running them. Each job row records
+its owner (host:pid), and while the owner has active jobs it refreshes
+their heartbeat_at every JOB_HEARTBEAT_SECONDS (default 15). recover()
+fails queued or running jobs whose owner has gone away: no heartbeat for
+JOB_STALE_SECONDS (default 60), or the owner is this very host:pid, so a
+previous incarnation. Jobs of other live processes, e.g. the old instance
+during a rolling deploy, are left alone. Run it once per process start
+before serving, like write_behind.recover().
+"""
+
+import json
+import os
+import socket
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+from src.models.job import Job
+from src.models.user import db
+
+
+class JobRunner:
+    """Thread pool that runs registered handlers for persisted Job rows"""
+
+    def __init__(self):
+        self.app = None
+        self.max_workers = 2
+        self.handlers = {}
+        self.heartbeat_interval = 15
+        self.stale_after = 60
+        self._active = 0
+        self._executor = None
+        self._heartbeat_thread = None
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        """Configure the pool from the environment; threads start with the first job"""
+        self.app = app
+        self.max_workers = int(os.getenv('JOB_WORKERS', '2'))
+        self.heartbeat_interval = int(os.getenv('JOB_HEARTBEAT_SECONDS', '15'))
+        self.stale_after = int(os.getenv('JOB_STALE_SECONDS', '60'))
+
+    @property
+    def owner(self):
+        """This process, as recorded on the jobs it queues and runs"""
+        return f'{socket.gethostname()}:{os.getpid()}'
+
+    def handler(self, kind):
+        """Decorator registering a function(params) -> result as the handler for a job kind"""
+        def register(func):
+            self.handlers[kind] = func
+            return func
+        return register
+
+    def submit(self, kind, params=None, dedupe=False):
+        """Persist a queued job and schedule it; returns the Job.
+
+        With dedupe=True, an already queued or running job of the same kind
+        is returned instead of starting another one.
+        """
+        if kind not in self.handlers:
+            raise ValueError(f'Unknown job kind: {kind}')
+
+        if dedupe:
+            active = Job.query.filter(
+                Job.kind == kind, Job.status.in_(Job.ACTIVE_STATUSES)
+            ).order_by(Job.id).first()
+            if active:
+                return active
+
+        job = Job(
+            kind=kind, status='queued', params=json.dumps(params or {}),
+            owner=self.owner, heartbeat_at=datetime.utcnow()
+        )
+        db.session.add(job)
+        db.session.commit()
+        pool = self._pool()
+        with self._lock:
+            self._active += 1
+        pool.submit(self._run, job.id)
+        return job
+
+    def _pool(self):
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='job')
+            if self._heartbeat_thread is None or not self._heartbeat_thread.is_alive():
+                self._heartbeat_thread = threading.Thread(target=self._heartbeat, name='job-heartbeat', daemon=True)
+                self._heartbeat_thread.start()
+            return self._executor
+
+    def _heartbeat(self):
+        while True:
+            time.sleep(self.heartbeat_interval)
+            if not self._active:
+                continue
+            try:
+                self.beat()
+            except Exception as e:
+                print(f"❌ Job heartbeat failed: {str(e)}")
+
+    def beat(self):
+        """Refresh heartbeat_at on this process's queued and running jobs"""
+        with self.app.app_context():
+            db.session.execute(
+                db.update(Job).where(Job.owner == self.owner, Job.status.in_(Job.ACTIVE_STATUSES))
+                .values(heartbeat_at=datetime.utcnow())
+            )
+            db.session.commit()
+
+    def _run(self, job_id):
+        try:
+            self._execute(job_id)
+        finally:
+            with self._lock:
+                self._active -= 1
+
+    def _execute(self, job_id):
+        with self.app.app_context():
+            job = db.session.get(Job, job_id)
+            job.status = 'running'
+            job.started_at = datetime.utcnow()
+            job.heartbeat_at = job.started_at
+            db.session.commit()
+            kind, params = job.kind, job.get_params()
+
+            try:
+                result = self.handlers[kind](params)
+                status, error = 'succeeded', None
+            except Exception as e:
+                db.session.rollback()
+                result, status, error = None, 'failed', str(e)
+                print(f"❌ Job {job_id} ({kind}) failed: {error}")
+
+            db.session.execute(
+                db.update(Job).where(Job.id == job_id).values(
+                    status=status,
+                    result=json.dumps(result) if result is not None else None,
+                    error=error,
+                    finished_at=datetime.utcnow()
+                )
+            )
+            db.session.commit()
+
+    def recover(self):
+        """Fail active jobs whose owning process has gone away; returns how many"""
+        now = datetime.utcnow()
+        abandoned = db.or_(
+            Job.owner == self.owner,
+            Job.heartbeat_at.is_(None),
+            Job.heartbeat_at < now - timedelta(seconds=self.stale_after)
+        )
+        interrupted = db.session.execute(
+            db.update(Job).where(Job.status.in_(Job.ACTIVE_STATUSES), abandoned).values(
+                status='failed', error='Interrupted by a restart', finished_at=now
+            )
+        ).rowcount
+        db.session.commit()
+        return interrupted
+
+    def after_fork(self):
+        """Drop a pool inherited from the parent; a forked worker starts its own on demand"""
+        self._executor = None
+        self._heartbeat_thread = None
+        self._active = 0
+        self._lock = threading.Lock()
+
+    def shutdown(self, wait=False):
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait, cancel_futures=True)
+
+
+jobs = JobRunner()
@@ -0,0 +1,30 @@
+"""
+JSON encoding for hot responses.
+
+Uses orjson when it is installed and falls back to the stdlib json module,
+always producing compact UTF-8 bytes.
+"""
+
+import json
+import time
+
+from src.services.instrumentation import record_serialization
+
+try:
+    import orjson
+except ImportError:  # optional speedup
+    orjson = None
+
+
+ENCODER = 'orjson' if orjson else 'json'
+
+
+def dumps(obj, sort_keys=False):
+    """Encode obj as compact UTF-8 JSON bytes"""
+    start = time.perf_counter()
+    if orjson is not None:
+        encoded = orjson.dumps(obj, option=orjson.OPT_SORT_KEYS if sort_keys else None)
+    else:
+        encoded = json.dumps(obj, ensure_ascii=False, separators=(',', ':'), sort_keys=sort_keys).encode('utf-8')
+    record_serialization(time.perf_counter() - start)
+    return encoded
@@ -0,0 +1,90 @@
+"""
+Keyset (cursor) pagination and NDJSON streaming helpers.
+
+Cursors are opaque URL-safe tokens holding the sort key of the last item
+on the previous page, so every page is an indexed range scan regardless of
+how deep it is. NDJSON responses stream one JSON document per line from a
+generator, so memory stays flat no matter how many rows are sent.
+"""
+
+import base64
+import bisect
+import json
+
+from flask import Response, stream_with_context
+
+from src.services import json_codec
+
+# Rows fetched per round-trip when streaming from the database
+STREAM_BATCH_SIZE = 1000
+
+MAX_PAGE_SIZE = 1000
+
+
+class InvalidCursor(ValueError):
+    """Raised for a cursor token that cannot be decoded"""
+
+
+def encode_cursor(key):
+    """Opaque token for a sort key (a list of JSON values)"""
+    return base64.urlsafe_b64encode(json.dumps(key).encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(token, types):
+    """Sort key from a cursor token, or None when no cursor was given.
+
+    types gives the expected type of each key part, e.g. (str, int).
+    """
+    if not token:
+        return None
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        key = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+    except ValueError:
+        raise InvalidCursor('Invalid cursor')
+    if not isinstance(key, list) or len(key) != len(types):
+        raise InvalidCursor('Invalid cursor')
+    if not all(isinstance(part, kind) for part, kind in zip(key, types)):
+        raise InvalidCursor('Invalid cursor')
+    return key
+
+
+def page_size(raw):
+    """Clamp a limit= query value to 1..MAX_PAGE_SIZE; None when absent"""
+    if raw is None:
+        return None
+    return max(1, min(raw, MAX_PAGE_SIZE))
+
+
+def keyset_page(items, sort_key, cursor, limit):
+    """Slice an already sorted list after cursor; returns (page, next cursor or None)"""
+    start = bisect.bisect_right(items, tuple(cursor), key=sort_key) if cursor else 0
+    end = len(items) if limit is None else start + limit
+    page = items[start:end]
+    next_cursor = encode_cursor(list(sort_key(page[-1]))) if page and end < len(items) else None
+    return page, next_cursor
+
+
+def batched(iterable, size=STREAM_BATCH_SIZE):
+    """Yield lists of up to size items"""
+    batch = []
+    for item in iterable:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def wants_ndjson(request):
+    return request.args.get('format') == 'ndjson' or request.accept_mimetypes.best == 'application/x-ndjson'
+
+
+def ndjson_response(items):
+    """Stream an iterable of JSON-serializable items as newline-delimited JSON"""
+    def generate():
+        for item in items:
+            yield json_codec.dumps(item) + b'\n'
+
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
@@ -0,0 +1,102 @@
+"""
+Atomic upserts for UserWordProgress.
+
+Answers are applied with a single INSERT ... ON CONFLICT DO UPDATE keyed on
+the (user_id, word_id) unique index, so concurrent answers for the same word
+never lose increments or create duplicate rows. On conflict the counters,
+mastery level and Leitner schedule are computed by the database from the
+stored row.
+"""
+
+from datetime import datetime
+
+from sqlalchemy import Float, case, cast, func
+from sqlalchemy.dialects import postgresql, sqlite
+
+from src.models.user import db
+from src.models.word import UserWordProgress
+from src.services import scheduler
+
+
+def _dialect_insert():
+    dialect = db.engine.dialect.name
+    if dialect == 'postgresql':
+        return postgresql.insert
+    if dialect == 'sqlite':
+        return sqlite.insert
+    raise NotImplementedError(f'Progress upserts are not supported on {dialect}')
+
+
+def aggregate_answers(answers):
+    """Collapse answers into one change per word: summed counters, last status wins"""
+    changes = {}
+    for answer in answers:
+        change = changes.setdefault(answer['word_id'], {
+            'word_id': answer['word_id'],
+            'status': 'unknown',
+            'attempts': 0,
+            'correct_attempts': 0
+        })
+        change['status'] = answer.get('status', 'unknown')
+        change['attempts'] += 1
+        if answer.get('correct'):
+            change['correct_attempts'] += 1
+    return list(changes.values())
+
+
+def record_answers(user_id, answers, now=None):
+    """Apply answers ({word_id, status, correct}) for one user in one statement.
+
+    A word moves up a Leitner box only if every answer for it in this batch
+    was correct; any miss sends it back to box 1. Returns the resulting
+    UserWordProgress rows; the caller commits.
+    """
+    changes = aggregate_answers(answers)
+    if not changes:
+        return []
+
+    now = scheduler.now_ts() if now is None else now
+    practiced_at = datetime.utcnow()
+    rows = [{
+        'user_id': user_id,
+        'word_id': change['word_id'],
+        'status': change['status'],
+        'attempts': change['attempts'],
+        'correct_attempts': change['correct_attempts'],
+        'mastery_level': change['correct_attempts'] / change['attempts'],
+        'last_practiced': practiced_at,
+        'box': 1,
+        'due_at': now + scheduler.BOX_INTERVALS[1]
+    } for change in changes]
+
+    stmt = _dialect_insert()(UserWordProgress).values(rows)
+    excluded = stmt.excluded
+
+    total_attempts = func.coalesce(UserWordProgress.attempts, 0) + excluded.attempts
+    total_correct = func.coalesce(UserWordProgress.correct_attempts, 0) + excluded.correct_attempts
+    current_box = func.coalesce(UserWordProgress.box, 0)
+    box = case(
+        (excluded.correct_attempts != excluded.attempts, 1),
+        (current_box >= scheduler.MAX_BOX, scheduler.MAX_BOX),
+        else_=current_box + 1
+    )
+    interval = case(
+        {level: seconds for level, seconds in enumerate(scheduler.BOX_INTERVALS)},
+        value=box,
+        else_=scheduler.BOX_INTERVALS[-1]
+    )
+
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[UserWordProgress.user_id, UserWordProgress.word_id],
+        set_={
+            'status': excluded.status,
+            'attempts': total_attempts,
+            'correct_attempts': total_correct,
+            'mastery_level': cast(total_correct, Float) / total_attempts,
+            'last_practiced': excluded.last_practiced,
+            'box': box,
+            'due_at': now + interval
+        }
+    ).returning(UserWordProgress)
+
+    return db.session.scalars(stmt, execution_options={'populate_existing': True}).all()
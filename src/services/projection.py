@@ -0,0 +1,70 @@
+"""
+Sparse field selection (?fields=) for User and Word responses.
+
+Clients pass a comma-separated list of fields or the name of a preset
+projection, e.g. fields=quiz or fields=id,word,emoji. 'id' is always
+included so responses can still be matched to records.
+"""
+
+from src.models.user import User
+from src.models.word import Word
+
+WORD_FIELDS = (
+    'id', 'word', 'pronunciation', 'definition', 'example', 'fun_fact', 'image_url',
+    'emoji', 'category', 'difficulty', 'created_at', 'updated_at'
+)
+
+WORD_PROJECTIONS = {
+    'quiz': ('id', 'word', 'definition', 'emoji'),
+    'card': ('id', 'word', 'pronunciation', 'definition', 'example', 'fun_fact', 'image_url', 'emoji'),
+    'list': ('id', 'word', 'emoji', 'category', 'difficulty'),
+}
+
+USER_PROJECTIONS = {
+    'summary': ('id', 'username', 'level', 'xp', 'words_learned', 'current_streak', 'best_streak'),
+    'profile': tuple(field for field in User.DICT_FIELDS if field not in User.JSON_FIELDS),
+}
+
+
+class InvalidFields(ValueError):
+    """Raised for a fields= value naming unknown fields"""
+
+
+def parse_fields(raw, allowed, projections):
+    """Resolve a fields= value to a tuple of field names, or None for all fields"""
+    if not raw:
+        return None
+    if raw in projections:
+        return projections[raw]
+
+    requested = [field.strip() for field in raw.split(',') if field.strip()]
+    unknown = [field for field in requested if field not in allowed]
+    if unknown:
+        raise InvalidFields(f"Unknown fields: {', '.join(unknown)}")
+
+    return tuple(['id'] + [field for field in dict.fromkeys(requested) if field != 'id'])
+
+
+def parse_word_fields(raw):
+    return parse_fields(raw, WORD_FIELDS, WORD_PROJECTIONS)
+
+
+def parse_user_fields(raw):
+    return parse_fields(raw, User.DICT_FIELDS, USER_PROJECTIONS)
+
+
+def project(item, fields):
+    """Copy of a serialized dict limited to fields (or the dict itself when fields is None)"""
+    if fields is None:
+        return item
+    return {field: item[field] for field in fields}
+
+
+def word_columns(fields):
+    """Mapped Word columns needed to serialize fields, for load_only()"""
+    return [getattr(Word, field) for field in fields]
+
+
+def user_columns(fields):
+    """Mapped User columns needed to serialize fields, for load_only()"""
+    return [getattr(User, field) for field in fields]
@@ -0,0 +1,190 @@
+"""
+Slow-query log, N+1 detector and query budgets.
+
+    QUERY_LOG                 off | dev | sampled (default: off)
+    QUERY_LOG_SAMPLE_RATE     fraction of requests inspected in sampled mode (default: 0.01)
+    SLOW_QUERY_MS             log statements slower than this, with their parameters (default: 200)
+    N_PLUS_ONE_THRESHOLD      flag a request running the same statement more than this often (default: 10)
+
+dev inspects every request; sampled inspects a random share of them, which
+keeps the per-query cost off most production traffic. In an inspected
+request every statement is normalized (literals and IN-lists collapsed)
+and counted, so a per-row `filter_by(...).first()` loop shows up as one
+statement repeated once per row.
+
+For tests, count_queries() counts statements on every engine, and
+query_budget(n) raises QueryBudgetExceeded when its block runs more than
+n statements (tests/conftest.py exposes it as the query_budget fixture):
+
+    def test_word_list(client, query_budget):
+        with query_budget(2):
+            client.get('/api/words?user_id=1')
+"""
+
+import os
+import random
+import re
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from flask import request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+MAX_PARAMS_LENGTH = 500
+
+_WHITESPACE = re.compile(r'\s+')
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r'\b\d+(?:\.\d+)?\b')
+_PLACEHOLDER_LIST = re.compile(r'\(\s*(?:\?|%\(\w+\)s|%s|:\w+)(?:\s*,\s*(?:\?|%\(\w+\)s|%s|:\w+))*\s*\)')
+
+
+def normalize_sql(statement):
+    """Statement text with literals and placeholder lists collapsed, for grouping repeats"""
+    statement = _WHITESPACE.sub(' ', statement).strip()
+    statement = _STRING_LITERAL.sub('?', statement)
+    statement = _NUMBER_LITERAL.sub('?', statement)
+    return _PLACEHOLDER_LIST.sub('(?...)', statement)
+
+
+def format_params(parameters, executemany):
+    """Bound parameters for a log line, truncated; executemany shows the row count and first row"""
+    if executemany and parameters:
+        text = f'{len(parameters)} rows, first: {parameters[0]!r}'
+    else:
+        text = repr(parameters)
+    if len(text) > MAX_PARAMS_LENGTH:
+        text = text[:MAX_PARAMS_LENGTH] + '...'
+    return text
+
+
+class RequestQueries:
+    """Statements run by one inspected request"""
+
+    __slots__ = ('endpoint', 'counts')
+
+    def __init__(self, endpoint):
+        self.endpoint = endpoint
+        self.counts = Counter()
+
+
+_inspected = ContextVar('inspected_queries', default=None)
+
+
+class QueryInspector:
+    def __init__(self):
+        self.mode = 'off'
+        self.sample_rate = 0.01
+        self.slow_seconds = 0.2
+        self.repeat_threshold = 10
+        self.slow_queries = 0
+        self.n_plus_one = 0
+
+    def init_app(self, app, engines):
+        """Hook requests and the given engines according to QUERY_LOG"""
+        self.mode = os.getenv('QUERY_LOG', 'off')
+        if self.mode not in ('dev', 'sampled'):
+            return
+
+        self.sample_rate = 1.0 if self.mode == 'dev' else float(os.getenv('QUERY_LOG_SAMPLE_RATE', '0.01'))
+        self.slow_seconds = int(os.getenv('SLOW_QUERY_MS', '200')) / 1000
+        self.repeat_threshold = int(os.getenv('N_PLUS_ONE_THRESHOLD', '10'))
+
+        app.before_request(self._start)
+        app.after_request(self._finish)
+        for engine in engines:
+            event.listen(engine, 'before_cursor_execute', self._before_cursor_execute)
+            event.listen(engine, 'after_cursor_execute', self._after_cursor_execute)
+
+    def _start(self):
+        if self.sample_rate >= 1 or random.random() < self.sample_rate:
+            _inspected.set(RequestQueries(request.endpoint or 'unmatched'))
+
+    def _finish(self, response):
+        inspected = _inspected.get()
+        if inspected is None:
+            return response
+        _inspected.set(None)
+
+        for statement, count in inspected.counts.items():
+            if count > self.repeat_threshold:
+                self.n_plus_one += 1
+                print(f"🔁 Possible N+1 in {inspected.endpoint}: {count}x {statement}")
+        return response
+
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        if _inspected.get() is not None:
+            conn.info['query_log_start'] = time.perf_counter()
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        inspected = _inspected.get()
+        if inspected is None:
+            return
+
+        elapsed = time.perf_counter() - conn.info.pop('query_log_start', time.perf_counter())
+        inspected.counts[normalize_sql(statement)] += 1
+        if elapsed >= self.slow_seconds:
+            self.slow_queries += 1
+            print(
+                f"🐢 Slow query ({elapsed * 1000:.1f} ms) in {inspected.endpoint}: "
+                f"{_WHITESPACE.sub(' ', statement).strip()} | params: {format_params(parameters, executemany)}"
+            )
+
+    def stats(self):
+        return {
+            'mode': self.mode,
+            'sample_rate': self.sample_rate if self.mode != 'off' else 0,
+            'slow_queries': self.slow_queries,
+            'n_plus_one_warnings': self.n_plus_one
+        }
+
+
+query_inspector = QueryInspector()
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+class QueryCount:
+    """Statements executed inside a count_queries() block"""
+
+    def __init__(self):
+        self.statements = []
+
+    def __len__(self):
+        return len(self.statements)
+
+    def repeated(self, threshold=1):
+        """Normalized statements run more than threshold times, with their counts"""
+        counts = Counter(normalize_sql(statement) for statement in self.statements)
+        return {statement: count for statement, count in counts.items() if count > threshold}
+
+
+@contextmanager
+def count_queries():
+    """Count statements executed on any engine while the block runs"""
+    counted = QueryCount()
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        counted.statements.append(statement)
+
+    event.listen(Engine, 'after_cursor_execute', record)
+    try:
+        yield counted
+    finally:
+        event.remove(Engine, 'after_cursor_execute', record)
+
+
+@contextmanager
+def query_budget(limit):
+    """Raise QueryBudgetExceeded if the block executes more than limit statements"""
+    with count_queries() as counted:
+        yield counted
+    if len(counted) > limit:
+        listing = '\n'.join(f'  {count}x {statement}' for statement, count in
+                            Counter(normalize_sql(s) for s in counted.statements).most_common())
+        raise QueryBudgetExceeded(f'{len(counted)} queries, budget is {limit}:\n{listing}')
+
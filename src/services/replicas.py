@@ -0,0 +1,140 @@
+"""
+Optional read-replica routing.
+
+DATABASE_REPLICA_URLS is a comma-separated list of read replicas. Each one
+becomes a Flask-SQLAlchemy bind (replica_0, replica_1, ...) with the same
+pool settings as the primary. Views decorated with @replica_reads send
+their GET/HEAD requests to one replica picked at random per request;
+every other route, and every write statement, stays on the primary.
+
+Read-your-writes: a successful POST/PUT/PATCH/DELETE on a /users/<user_id>/...
+route marks that user for DATABASE_REPLICA_STICKY_SECONDS (default 5), and
+reads for a marked user (a user_id in the URL path or query string) go to
+the primary until replication has caught up. The marks are kept in process
+memory, keyed on user_id rather than on a cookie the cross-site frontend
+would not send; a read served by a different gunicorn worker than the
+write is not covered.
+
+Without DATABASE_REPLICA_URLS nothing changes: every query uses the primary.
+"""
+
+import os
+import random
+import threading
+import time
+from contextlib import contextmanager
+
+from flask import current_app, g, has_request_context, request
+from flask_sqlalchemy.session import Session
+
+from src.services.database import engine_options_from_env
+
+WRITE_METHODS = ('POST', 'PUT', 'PATCH', 'DELETE')
+
+
+def replica_reads(view):
+    """Mark a view as safe to serve from a read replica"""
+    view.replica_reads = True
+    return view
+
+
+class ReplicaRouter:
+    """Chooses the bind for each request: a replica for marked read-only views, else the primary"""
+
+    def __init__(self):
+        self.bind_keys = []
+        self.sticky_seconds = 5
+        # user_id -> monotonic deadline until which the user's reads use the primary
+        self._primary_until = {}
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        """Register replica binds and request hooks; call before db.init_app(app)"""
+        urls = [url.strip() for url in os.getenv('DATABASE_REPLICA_URLS', '').split(',') if url.strip()]
+        self.bind_keys = []
+        self._primary_until = {}
+        if not urls:
+            return
+
+        self.sticky_seconds = float(os.getenv('DATABASE_REPLICA_STICKY_SECONDS', '5'))
+        binds = app.config.setdefault('SQLALCHEMY_BINDS', {})
+        for index, url in enumerate(urls):
+            if url.startswith('postgres://'):
+                url = url.replace('postgres://', 'postgresql://', 1)
+            key = f'replica_{index}'
+            binds[key] = {'url': url, **engine_options_from_env(url)}
+            self.bind_keys.append(key)
+
+        app.before_request(self._choose_bind)
+        app.after_request(self._stick_after_write)
+
+    def _choose_bind(self):
+        view = current_app.view_functions.get(request.endpoint)
+        if not getattr(view, 'replica_reads', False) or request.method not in ('GET', 'HEAD'):
+            return
+        user_id = self._request_user_id()
+        if user_id is not None and self.is_sticky(user_id):
+            return
+        g.db_replica = random.choice(self.bind_keys)
+
+    def _stick_after_write(self, response):
+        if request.method in WRITE_METHODS and response.status_code < 400:
+            user_id = (request.view_args or {}).get('user_id')
+            if user_id is not None:
+                self.stick(user_id)
+        return response
+
+    @staticmethod
+    def _request_user_id():
+        user_id = (request.view_args or {}).get('user_id')
+        if user_id is None:
+            user_id = request.args.get('user_id', type=int)
+        return user_id
+
+    def stick(self, user_id):
+        """Send the user's reads to the primary for the next sticky_seconds"""
+        now = time.monotonic()
+        with self._lock:
+            self._primary_until[user_id] = now + self.sticky_seconds
+            if len(self._primary_until) > 1000:
+                # Drop expired marks so the map stays as small as the set of recent writers
+                self._primary_until = {
+                    key: until for key, until in self._primary_until.items() if until > now
+                }
+
+    def is_sticky(self, user_id):
+        with self._lock:
+            return self._primary_until.get(user_id, 0) > time.monotonic()
+
+    def current(self):
+        """Bind key of the replica serving this request, or None for the primary"""
+        if not self.bind_keys or not has_request_context():
+            return None
+        return g.get('db_replica')
+
+    @contextmanager
+    def primary(self):
+        """Read from the primary inside a replica-routed request"""
+        if not has_request_context():
+            yield
+            return
+        previous = g.pop('db_replica', None)
+        try:
+            yield
+        finally:
+            if previous is not None:
+                g.db_replica = previous
+
+
+class RoutingSession(Session):
+    """Session sending reads to the request's replica, and writes and flushes to the primary"""
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and not self._flushing and not getattr(clause, 'is_dml', False):
+            key = replicas.current()
+            if key is not None:
+                return self._db.engines[key]
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+replicas = ReplicaRouter()
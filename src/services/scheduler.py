@@ -0,0 +1,57 @@
+"""
+Leitner-style spaced repetition scheduling for UserWordProgress.
+
+A correct answer moves a word up one box, a wrong answer sends it back to
+box 1 (applied in SQL by src.services.progress). Each box has a review
+interval; the resulting due time is stored on the progress row and indexed
+by (user_id, due_at), so picking the next due words is a single indexed query.
+Never-practiced words come from the catalog snapshot, skipping the word ids
+the user already has progress for.
+"""
+
+import time
+from itertools import islice
+
+from src.models.user import db
+from src.models.word import UserWordProgress
+
+DAY = 24 * 60 * 60
+
+# Review interval in seconds for each box; box 0 means never practiced
+BOX_INTERVALS = [0, 10 * 60, DAY, 3 * DAY, 7 * DAY, 14 * DAY, 30 * DAY]
+MAX_BOX = len(BOX_INTERVALS) - 1
+
+
+def now_ts():
+    return int(time.time())
+
+
+def next_words(user_id, count, snapshot, now=None):
+    """Up to count (word_id, progress) pairs to practice next.
+
+    Overdue words come first, most overdue and least mastered first, then
+    words of snapshot (a CatalogSnapshot) the user has never practiced, in
+    id order. Both lookups use the user's progress indexes; neither reads
+    the word table.
+    """
+    now = now_ts() if now is None else now
+
+    due = UserWordProgress.query.filter(
+        UserWordProgress.user_id == user_id,
+        UserWordProgress.due_at <= now
+    ).order_by(
+        UserWordProgress.due_at,
+        UserWordProgress.mastery_level
+    ).limit(count).all()
+
+    picked = [(progress.word_id, progress) for progress in due]
+
+    remaining = count - len(picked)
+    if remaining > 0:
+        seen = set(db.session.scalars(
+            db.select(UserWordProgress.word_id).where(UserWordProgress.user_id == user_id)
+        ))
+        unseen = (word_id for word_id in snapshot.ids if word_id not in seen)
+        picked.extend((word_id, None) for word_id in islice(unseen, remaining))
+
+    return picked
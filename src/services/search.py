@@ -0,0 +1,122 @@
+"""
+In-process inverted index over the word catalog for /api/words/search.
+
+Built once per catalog load and extended copy-on-write when words are
+added (with_words). Matching is case-insensitive on word, definition and
+example, supports prefixes (for partially typed terms) and ranks results
+by field-weighted score.
+"""
+
+import bisect
+import heapq
+import re
+
+TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+
+# Relative weight of a match in each field
+FIELD_WEIGHTS = (('word', 10.0), ('definition', 3.0), ('example', 1.0))
+
+# A prefix match counts for less than an exact token match
+PREFIX_FACTOR = 0.5
+
+# Cap on vocabulary terms a single prefix may expand to
+MAX_PREFIX_EXPANSION = 500
+
+# Extra score when the whole query equals the word itself
+EXACT_WORD_BONUS = 100.0
+
+
+def tokenize(text):
+    return TOKEN_RE.findall(text.lower()) if text else []
+
+
+class SearchIndex:
+    """Token -> {word_id: weight} postings plus a sorted vocabulary for prefix lookups"""
+
+    def __init__(self, words):
+        self.words = {word['id']: word for word in words}
+        self.postings = {}
+
+        for word in words:
+            for field, weight in FIELD_WEIGHTS:
+                for token in set(tokenize(word.get(field))):
+                    scores = self.postings.setdefault(token, {})
+                    scores[word['id']] = scores.get(word['id'], 0.0) + weight
+
+        self.vocabulary = sorted(self.postings)
+
+    def with_words(self, words):
+        """New index containing these extra words; postings it touches are copied, the rest shared"""
+        derived = SearchIndex([])
+        derived.words = dict(self.words)
+        derived.postings = dict(self.postings)
+        derived.vocabulary = list(self.vocabulary)
+        copied = set()
+
+        for word in words:
+            derived.words[word['id']] = word
+            for field, weight in FIELD_WEIGHTS:
+                for token in set(tokenize(word.get(field))):
+                    if token not in copied:
+                        if token not in derived.postings:
+                            bisect.insort(derived.vocabulary, token)
+                        derived.postings[token] = dict(derived.postings.get(token, {}))
+                        copied.add(token)
+                    scores = derived.postings[token]
+                    scores[word['id']] = scores.get(word['id'], 0.0) + weight
+        return derived
+
+    def _expand(self, token):
+        """Vocabulary terms matching token: itself (exact) and terms it prefixes"""
+        start = bisect.bisect_left(self.vocabulary, token)
+        terms = []
+        for term in self.vocabulary[start:start + MAX_PREFIX_EXPANSION]:
+            if not term.startswith(token):
+                break
+            terms.append(term)
+        return terms
+
+    def _token_scores(self, token):
+        scores = {}
+        for term in self._expand(token):
+            factor = 1.0 if term == token else PREFIX_FACTOR
+            for word_id, weight in self.postings[term].items():
+                score = weight * factor
+                if score > scores.get(word_id, 0.0):
+                    scores[word_id] = score
+        return scores
+
+    def search(self, query, offset=0, limit=50):
+        """Ranked matches for query as (total, page of serialized words).
+
+        Every query token has to match (exactly or as a prefix) somewhere in
+        the word, definition or example.
+        """
+        tokens = list(dict.fromkeys(tokenize(query)))
+        if not tokens:
+            return 0, []
+
+        scores = None
+        for token in tokens:
+            token_scores = self._token_scores(token)
+            if scores is None:
+                scores = token_scores
+            else:
+                scores = {
+                    word_id: score + token_scores[word_id]
+                    for word_id, score in scores.items() if word_id in token_scores
+                }
+            if not scores:
+                return 0, []
+
+        normalized = ' '.join(tokens)
+        for word_id in scores:
+            if self.words[word_id]['word'] == normalized:
+                scores[word_id] += EXACT_WORD_BONUS
+
+        ranked = heapq.nsmallest(
+            offset + limit,
+            scores,
+            key=lambda word_id: (-scores[word_id], self.words[word_id]['word'])
+        )
+        return len(scores), [self.words[word_id] for word_id in ranked[offset:]]
@@ -0,0 +1,52 @@
+"""
+Prefix autocomplete over Word.word for /api/words/suggest.
+
+A sorted array of (word, id) keys answers a prefix with one binary search
+plus a short forward scan. Adding words copies the array and inserts in
+order, so readers of the previous index are never disturbed.
+"""
+
+import bisect
+
+
+class SuggestIndex:
+    """Sorted (lowercased word, id) keys with the serialized word for each id"""
+
+    def __init__(self, keys=None, words_by_id=None):
+        self.keys = keys or []
+        self.words_by_id = words_by_id or {}
+
+    @classmethod
+    def build(cls, words):
+        keys = sorted((word['word'].lower(), word['id']) for word in words)
+        return cls(keys, {word['id']: word for word in words})
+
+    def with_words(self, words):
+        """New index containing these extra words, without re-sorting the existing keys"""
+        keys = list(self.keys)
+        words_by_id = dict(self.words_by_id)
+        for word in words:
+            bisect.insort(keys, (word['word'].lower(), word['id']))
+            words_by_id[word['id']] = word
+        return SuggestIndex(keys, words_by_id)
+
+    def complete(self, prefix, limit=10, category=None, difficulty=None):
+        """Up to limit words starting with prefix, alphabetically, optionally filtered"""
+        prefix = prefix.lower()
+        if category == 'all':
+            category = None
+        if difficulty == 'all':
+            difficulty = None
+
+        matches = []
+        for position in range(bisect.bisect_left(self.keys, (prefix,)), len(self.keys)):
+            key, word_id = self.keys[position]
+            if not key.startswith(prefix) or len(matches) >= limit:
+                break
+            word = self.words_by_id[word_id]
+            if category and word['category'] != category:
+                continue
+            if difficulty and word['difficulty'] != difficulty:
+                continue
+            matches.append(word)
+        return matches
@@ -0,0 +1,198 @@
+"""
+Set-based bulk import of words.
+
+Rows are validated and processed in chunks: one query per chunk finds words
+that already exist, and the new rows go in with a single executemany insert
+(or COPY on Postgres/psycopg2 for large chunks) instead of one ORM add and
+one existence check per row.
+"""
+
+import csv
+import io
+import json
+from datetime import datetime
+
+from sqlalchemy import insert
+
+from src.models.user import db
+from src.models.word import Word
+
+WORD_COLUMNS = (
+    'word', 'pronunciation', 'definition', 'example', 'fun_fact', 'image_url',
+    'emoji', 'category', 'difficulty'
+)
+
+CHUNK_SIZE = 1000
+
+# Chunks at least this large use COPY when the driver supports it
+COPY_THRESHOLD = 500
+
+
+class InvalidRow:
+    """Placeholder for an input row that could not even be parsed"""
+
+    def __init__(self, message):
+        self.message = message
+
+
+def iter_csv_rows(stream):
+    """Parse a binary CSV stream (header row first) into dicts, one line at a time"""
+    text = io.TextIOWrapper(stream, encoding='utf-8-sig', newline='')
+    for row in csv.DictReader(text):
+        yield {key.strip(): value for key, value in row.items() if key}
+
+
+def iter_ndjson_rows(stream):
+    """Parse a binary NDJSON stream into dicts, one line at a time"""
+    for line in io.TextIOWrapper(stream, encoding='utf-8-sig'):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield json.loads(line)
+        except ValueError:
+            yield InvalidRow('Invalid JSON')
+
+
+def normalize_row(word_data):
+    """Insert mapping for one input row, or raise ValueError with the reason it is invalid"""
+    if isinstance(word_data, InvalidRow):
+        raise ValueError(word_data.message)
+    if not isinstance(word_data, dict):
+        raise ValueError('Row must be an object')
+    if not word_data.get('word') or not word_data.get('definition'):
+        raise ValueError('Word and definition are required')
+
+    now = datetime.utcnow()
+    return {
+        'word': str(word_data['word']).strip().lower(),
+        'pronunciation': word_data.get('pronunciation'),
+        'definition': word_data['definition'],
+        'example': word_data.get('example'),
+        'fun_fact': word_data.get('fun_fact'),
+        'image_url': word_data.get('image_url'),
+        'emoji': word_data.get('emoji'),
+        'category': word_data.get('category') or 'general',
+        'difficulty': word_data.get('difficulty') or 'medium',
+        'created_at': now,
+        'updated_at': now
+    }
+
+
+def _can_copy():
+    return db.engine.dialect.name == 'postgresql' and db.engine.dialect.driver == 'psycopg2'
+
+
+def _copy_rows(mappings):
+    """Load mappings with COPY ... FROM STDIN inside the session's transaction"""
+    columns = WORD_COLUMNS + ('created_at', 'updated_at')
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for mapping in mappings:
+        writer.writerow(['' if mapping[column] is None else mapping[column] for column in columns])
+    buffer.seek(0)
+
+    # Empty unquoted fields load as NULL
+    cursor = db.session.connection().connection.dbapi_connection.cursor()
+    try:
+        cursor.copy_expert(
+            f"COPY word ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)",
+            buffer
+        )
+    finally:
+        cursor.close()
+
+
+def import_chunk(rows, start_index=0, returning=True):
+    """Validate, dedupe and insert one chunk of rows; the caller commits.
+
+    Returns (created, errors) where created holds the inserted words as
+    serialized dicts (or just the word strings when returning=False) and
+    errors holds "Row N: reason" messages numbered from start_index + 1.
+    """
+    errors = []
+    mappings = []
+    for offset, word_data in enumerate(rows):
+        try:
+            mappings.append((start_index + offset + 1, normalize_row(word_data)))
+        except ValueError as e:
+            errors.append(f"Row {start_index + offset + 1}: {str(e)}")
+
+    candidates = {mapping['word'] for _, mapping in mappings}
+    existing = set()
+    if candidates:
+        existing = {row[0] for row in db.session.query(Word.word).filter(Word.word.in_(candidates))}
+
+    new_rows = []
+    seen = set()
+    for row_number, mapping in mappings:
+        if mapping['word'] in existing or mapping['word'] in seen:
+            errors.append(f"Row {row_number}: Word '{mapping['word']}' already exists")
+            continue
+        seen.add(mapping['word'])
+        new_rows.append(mapping)
+
+    if not new_rows:
+        return [], errors
+
+    if not returning:
+        if len(new_rows) >= COPY_THRESHOLD and _can_copy():
+            _copy_rows(new_rows)
+        else:
+            db.session.execute(insert(Word), new_rows)
+        return [mapping['word'] for mapping in new_rows], errors
+
+    result = db.session.execute(insert(Word).returning(*Word.__table__.c), new_rows)
+    return [Word(**row._mapping).to_dict() for row in result], errors
+
+
+def iter_chunks(rows, chunk_size=CHUNK_SIZE):
+    """Group rows into (start_index, chunk) lists of up to chunk_size"""
+    chunk = []
+    index = 0
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= chunk_size:
+            yield index, chunk
+            index += len(chunk)
+            chunk = []
+    if chunk:
+        yield index, chunk
+
+
+def import_words(rows, chunk_size=CHUNK_SIZE, returning=True):
+    """Import an iterable of word dicts in chunks; returns (created, errors) like import_chunk()"""
+    created = []
+    errors = []
+    for index, chunk in iter_chunks(rows, chunk_size):
+        chunk_created, chunk_errors = import_chunk(chunk, index, returning)
+        created.extend(chunk_created)
+        errors.extend(chunk_errors)
+    return created, errors
+
+
+def stream_import(rows, chunk_size=CHUNK_SIZE):
+    """Import rows chunk by chunk, committing each, and yield a progress report per chunk.
+
+    Only one chunk is held in memory at a time, so rows can come straight
+    from an upload stream. The final report has done=True and the totals.
+    """
+    totals = {'rows': 0, 'created': 0, 'errors': 0}
+    for index, chunk in iter_chunks(rows, chunk_size):
+        try:
+            created, errors = import_chunk(chunk, index, returning=False)
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            created, errors = [], [f"Rows {index + 1}-{index + len(chunk)}: {str(e)}"]
+
+        totals['rows'] += len(chunk)
+        totals['created'] += len(created)
+        totals['errors'] += len(errors)
+        yield {
+            'rows': f'{index + 1}-{index + len(chunk)}',
+            'created': len(created),
+            'errors': errors
+        }
+
+    yield dict(totals, done=True)
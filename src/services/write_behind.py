@@ -0,0 +1,357 @@
+"""
+Optional write-behind buffer for high-frequency progress and XP updates.
+
+When WRITE_BEHIND_ENABLED=1, update_user_progress and update_word_progress
+queue their changes here instead of committing per request. Changes are
+coalesced per user in memory, appended to a local journal file for crash
+recovery, and flushed to the database in one transaction every
+WRITE_BEHIND_FLUSH_MS milliseconds or WRITE_BEHIND_MAX_RECORDS queued records.
+
+Reads see the buffered state: user profile reads overlay pending fields in
+memory, and progress reads flush the user's pending answers first. Journal
+replay after a crash is at-least-once: a batch committed right before the
+crash, whose journal segment was not yet removed, is applied again.
+
+The buffer lives in one process's memory, so only that process can see
+buffered writes: with write-behind on, the app must run as a single worker
+process (threads are fine), which gunicorn.conf.py enforces. The journal
+is still named per pid (WRITE_BEHIND_JOURNAL suffixed with the pid) so the
+preloading gunicorn master and its worker never share a file, and replay
+picks up every journal under that prefix.
+
+A batch the database rejects outright (rather than a lost connection) is
+retried one user at a time; the users whose writes still fail are moved to
+WRITE_BEHIND_JOURNAL-rejected instead of blocking every later flush.
+"""
+
+import glob
+import json
+import os
+import threading
+import time
+
+from sqlalchemy import exc
+
+from src.models.user import User, db
+from src.services.progress import record_answers
+
+# User columns stored as JSON text, written through the model's setters
+JSON_FIELDS = ('progress_data', 'settings', 'achievements', 'virtual_pet')
+
+# Failures worth retrying as they are: the database, not the data, is the problem
+TRANSIENT_ERRORS = (exc.OperationalError, exc.InterfaceError, exc.TimeoutError)
+
+
+class WriteBehindBuffer:
+    """Coalescing, journaled buffer of per-user writes"""
+
+    def __init__(self):
+        self.enabled = False
+        self.app = None
+        self.journal_base = None
+        self.flush_interval = 0.5
+        self.max_records = 500
+        self.flushes = 0
+        self.rejected = 0
+        self._user_changes = {}
+        self._answers = {}
+        self._records = 0
+        self._journal = None
+        self._segment = 0
+        # Journal segments whose records are buffered but not yet committed
+        self._segments = []
+        self._lock = threading.RLock()
+        self._flush_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread = None
+
+    def init_app(self, app):
+        """Configure the buffer from the environment; no I/O until recover()/start()"""
+        self.enabled = os.getenv('WRITE_BEHIND_ENABLED', '0') == '1'
+        if not self.enabled:
+            return
+
+        self.app = app
+        self.journal_base = os.getenv(
+            'WRITE_BEHIND_JOURNAL', os.path.join(app.instance_path, 'write_behind.jsonl')
+        )
+        self.flush_interval = int(os.getenv('WRITE_BEHIND_FLUSH_MS', '500')) / 1000
+        self.max_records = int(os.getenv('WRITE_BEHIND_MAX_RECORDS', '500'))
+
+    def recover(self):
+        """Replay journals left by a crash and flush them; run once per deployment before serving"""
+        if not self.enabled:
+            return
+        os.makedirs(os.path.dirname(os.path.abspath(self.journal_base)), exist_ok=True)
+        replayed = self.replay()
+        if replayed:
+            print(f"🔄 Replayed {replayed} buffered writes from {self.journal_base}.*")
+            self.flush()
+
+    @property
+    def rejected_path(self):
+        """Where writes the database refused are kept for inspection; never replayed"""
+        return f'{self.journal_base}-rejected'
+
+    @property
+    def journal_path(self):
+        """This process's live journal"""
+        return f'{self.journal_base}.{os.getpid()}'
+
+    def start(self):
+        """Start the background flusher if it is not already running"""
+        if not self.enabled or (self._thread and self._thread.is_alive()):
+            return
+        self._thread = threading.Thread(target=self._run, name='write-behind', daemon=True)
+        self._thread.start()
+
+    def after_fork(self):
+        """Reset per-process state in a forked worker and start its own flusher"""
+        if not self.enabled:
+            return
+        self._journal = None
+        self._thread = None
+        self._lock = threading.RLock()
+        self._flush_lock = threading.Lock()
+        self.start()
+
+    # Queueing
+
+    def update_user(self, user_id, changes):
+        """Queue column changes for a user; later values win, best_streak keeps the maximum"""
+        self._enqueue({'type': 'user', 'user_id': user_id, 'changes': changes})
+
+    def add_answer(self, user_id, answer):
+        """Queue one answer ({word_id, status, correct}) for a user"""
+        self._enqueue({'type': 'answer', 'user_id': user_id, 'answer': answer})
+
+    def _enqueue(self, record, journal=True):
+        with self._lock:
+            if journal:
+                self._write_journal(record)
+            self._apply_record(record)
+            self._records += 1
+            if self._records >= self.max_records:
+                self._wake.set()
+
+    def _apply_record(self, record):
+        user_id = record['user_id']
+        if record['type'] == 'answer':
+            self._answers.setdefault(user_id, []).append(record['answer'])
+            return
+
+        pending = self._user_changes.setdefault(user_id, {})
+        for field, value in record['changes'].items():
+            if field == 'best_streak' and field in pending:
+                value = max(pending[field], value)
+            pending[field] = value
+
+    # Journal
+
+    def _write_journal(self, record):
+        if self._journal is None:
+            os.makedirs(os.path.dirname(os.path.abspath(self.journal_base)), exist_ok=True)
+            self._journal = open(self.journal_path, 'a', encoding='utf-8')
+        self._journal.write(json.dumps(record) + '\n')
+        self._journal.flush()
+        os.fsync(self._journal.fileno())
+
+    def _rotate_journal(self):
+        """Move the live journal aside so new writes start a fresh one; returns the segment path"""
+        if self._journal is not None:
+            self._journal.close()
+            self._journal = None
+        if not os.path.exists(self.journal_path):
+            return None
+
+        self._segment += 1
+        segment = f'{self.journal_path}.{int(time.time() * 1000)}.{self._segment}.flushing'
+        os.replace(self.journal_path, segment)
+        return segment
+
+    def replay(self):
+        """Load journal segments left on disk back into memory; returns the record count.
+
+        The segments are deleted by the next successful flush.
+        """
+        with self._lock:
+            self._rotate_journal()
+            count = 0
+            # Every process's live journals and unflushed segments, oldest first
+            paths = sorted(glob.glob(f'{self.journal_base}.*'), key=os.path.getmtime)
+            for path in paths:
+                with open(path, encoding='utf-8') as journal:
+                    for line in journal:
+                        line = line.strip()
+                        if not line:
+                            continue
+                        try:
+                            record = json.loads(line)
+                        except ValueError:
+                            # A torn final line from the crash itself
+                            continue
+                        self._enqueue(record, journal=False)
+                        count += 1
+                self._segments.append(path)
+            return count
+
+    # Reads
+
+    def user_dict(self, user, fields=None):
+        """user.to_dict(fields=fields) with any buffered changes applied"""
+        user_dict = user.to_dict(fields=fields)
+        if not self.enabled:
+            return user_dict
+
+        with self._lock:
+            changes = dict(self._user_changes.get(user.id, {}))
+        for field, value in changes.items():
+            if field not in user_dict:
+                continue
+            if field == 'best_streak':
+                value = max(user_dict['best_streak'] or 0, value)
+            user_dict[field] = value
+        return user_dict
+
+    def flush_user(self, user_id):
+        """Flush now if the user has buffered writes, so a following read sees them; True if it flushed"""
+        if not self.enabled:
+            return False
+        with self._lock:
+            pending = user_id in self._answers or user_id in self._user_changes
+        if pending:
+            self.flush()
+        return pending
+
+    # Flushing
+
+    def _run(self):
+        while True:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            try:
+                self.flush()
+            except Exception as e:
+                print(f"❌ Write-behind flush failed: {str(e)}")
+
+    def flush(self):
+        """Write all buffered changes to the database in one transaction.
+
+        If the database rejects the batch, each user's writes are retried on
+        their own and the ones that still fail are set aside in rejected_path.
+        """
+        with self._flush_lock:
+            with self._lock:
+                if not self._user_changes and not self._answers:
+                    return 0
+                user_changes, self._user_changes = self._user_changes, {}
+                answers, self._answers = self._answers, {}
+                records, self._records = self._records, 0
+                segment = self._rotate_journal()
+                segments, self._segments = self._segments + ([segment] if segment else []), []
+
+            try:
+                self._write(user_changes, answers)
+            except TRANSIENT_ERRORS:
+                self._requeue(segments, user_changes, answers, records)
+                raise
+            except Exception:
+                retry = self._write_each_user(user_changes, answers)
+                if retry:
+                    # Users written above are applied again if the process dies before
+                    # the retry succeeds, the same at-least-once as any crash replay
+                    self._requeue(
+                        segments,
+                        {user_id: user_changes[user_id] for user_id in retry if user_id in user_changes},
+                        {user_id: answers[user_id] for user_id in retry if user_id in answers},
+                        sum(len(answers.get(user_id, [])) + (user_id in user_changes) for user_id in retry)
+                    )
+                    raise
+
+            for path in segments:
+                os.remove(path)
+            self.flushes += 1
+            return records
+
+    def _write(self, user_changes, answers):
+        # A fresh app context gives the flush its own session, even inside a request
+        with self.app.app_context():
+            try:
+                for user_id, changes in user_changes.items():
+                    db.session.execute(
+                        db.update(User).where(User.id == user_id).values(**self._column_values(changes))
+                    )
+                for user_id, user_answers in answers.items():
+                    record_answers(user_id, user_answers)
+                db.session.commit()
+            except Exception:
+                db.session.rollback()
+                raise
+
+    def _write_each_user(self, user_changes, answers):
+        """Write user by user, rejecting users whose writes fail; returns the users to retry later"""
+        retry = set()
+        for user_id in dict.fromkeys([*user_changes, *answers]):
+            changes = {user_id: user_changes[user_id]} if user_id in user_changes else {}
+            user_answers = {user_id: answers[user_id]} if user_id in answers else {}
+            try:
+                self._write(changes, user_answers)
+            except TRANSIENT_ERRORS:
+                retry.add(user_id)
+            except Exception as e:
+                self._reject(user_id, changes.get(user_id), user_answers.get(user_id, []), e)
+        return retry
+
+    def _reject(self, user_id, changes, answers, error):
+        records = [{'type': 'answer', 'user_id': user_id, 'answer': answer} for answer in answers]
+        if changes:
+            records.insert(0, {'type': 'user', 'user_id': user_id, 'changes': changes})
+        with open(self.rejected_path, 'a', encoding='utf-8') as rejected:
+            for record in records:
+                rejected.write(json.dumps({**record, 'error': str(error)}, default=repr) + '\n')
+        self.rejected += len(records)
+        print(f"❌ Write-behind dropped {len(records)} writes for user {user_id}: {str(error)}")
+
+    def _requeue(self, segments, user_changes, answers, records):
+        # Put the batch back in front of anything queued meanwhile; its
+        # journal segments stay on disk until a later flush succeeds
+        with self._lock:
+            self._segments = segments + self._segments
+            for user_id, changes in user_changes.items():
+                queued = self._user_changes.get(user_id, {})
+                merged = {**changes, **queued}
+                if 'best_streak' in changes and 'best_streak' in queued:
+                    # Same rule as _apply_record: the streak record only grows
+                    merged['best_streak'] = max(changes['best_streak'], queued['best_streak'])
+                self._user_changes[user_id] = merged
+            for user_id, user_answers in answers.items():
+                self._answers[user_id] = user_answers + self._answers.get(user_id, [])
+            self._records += records
+
+    @staticmethod
+    def _column_values(changes):
+        values = {}
+        for field, value in changes.items():
+            if field in JSON_FIELDS:
+                values[field] = json.dumps(value)
+            elif field == 'best_streak':
+                values[field] = db.case(
+                    (db.func.coalesce(User.best_streak, 0) < value, value),
+                    else_=User.best_streak
+                )
+            else:
+                values[field] = value
+        return values
+
+    def stats(self):
+        with self._lock:
+            return {
+                'enabled': self.enabled,
+                'pending_records': self._records,
+                'pending_users': len(set(self._user_changes) | set(self._answers)),
+                'flushes': self.flushes,
+                'rejected_records': self.rejected
+            }
+
+
+write_behind = WriteBehindBuffer()
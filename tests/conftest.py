@@ -0,0 +1,88 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.main import create_app, initialize_database
+from src.models.user import User, db
+from src.models.word import UserWordProgress
+from src.services.catalog import catalog
+from src.services.query_log import query_budget as query_budget_context
+from src.services.word_import import import_words
+
+
+@pytest.fixture
+def make_app(tmp_path):
+    """Factory for apps on their own empty SQLite file; several can exist in one test"""
+    apps = []
+
+    def make(name='test', **config):
+        app = create_app({
+            'TESTING': True,
+            'SQLALCHEMY_DATABASE_URI': f'sqlite:///{tmp_path / name}.db',
+            **config
+        })
+        with app.app_context():
+            initialize_database(seed=False)
+        # The catalog cache is process-wide; start every app from a cold cache
+        catalog.invalidate()
+        apps.append(app)
+        return app
+
+    yield make
+
+    for app in apps:
+        with app.app_context():
+            db.session.remove()
+            for engine in db.engines.values():
+                engine.dispose()
+    catalog.invalidate()
+
+
+@pytest.fixture
+def app(make_app):
+    return make_app()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+def add_words(count, category='animals', difficulty='easy'):
+    """Insert count synthetic words; call inside an app context. Returns their ids."""
+    rows = [
+        {'word': f'word{i}', 'definition': f'definition {i}', 'category': category, 'difficulty': difficulty}
+        for i in range(count)
+    ]
+    created, errors = import_words(rows)
+    assert not errors
+    db.session.commit()
+    catalog.invalidate()
+    return [word['id'] for word in created]
+
+
+def add_user(username='kid', **fields):
+    """Insert a user; call inside an app context. Returns the id."""
+    user = User(username=username, **fields)
+    user.set_password('password123')
+    db.session.add(user)
+    db.session.commit()
+    return user.id
+
+
+def add_progress(user_id, word_ids, status='learning', due_at=0):
+    db.session.add_all(
+        UserWordProgress(user_id=user_id, word_id=word_id, status=status, attempts=1, correct_attempts=1,
+                         due_at=due_at)
+        for word_id in word_ids
+    )
+    db.session.commit()
+
+
+@pytest.fixture
+def query_budget():
+    """`with query_budget(n):` fails the test if the block runs more than n queries"""
+    return query_budget_context
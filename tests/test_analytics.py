@@ -0,0 +1,18 @@
+from src.models.user import User, db
+from src.models import word as word_models
+from src.services.analytics import recompute_user_stats
+
+from tests.conftest import add_user
+
+
+def test_recompute_rebuilds_tests_taken_and_keeps_words_learned(app):
+    with app.app_context():
+        user_id = add_user(words_learned=42, total_tests_taken=9)
+        db.session.add_all([word_models.TestResult(user_id=user_id, test_type='quiz', score=3, total_questions=5) for _ in range(2)])
+        db.session.commit()
+
+        assert recompute_user_stats([user_id]) == 1
+        db.session.commit()
+
+        user = db.session.get(User, user_id)
+        assert (user.words_learned, user.total_tests_taken) == (42, 2)
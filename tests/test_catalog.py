@@ -0,0 +1,93 @@
+from src.services.catalog import CatalogSnapshot, catalog
+
+from tests.conftest import add_words
+
+
+def make_word(word_id, word, category='animals', difficulty='easy', definition='a thing'):
+    return {'id': word_id, 'word': word, 'category': category, 'difficulty': difficulty,
+            'definition': definition, 'example': ''}
+
+
+BASE = [make_word(1, 'cat'), make_word(2, 'apple', 'food'), make_word(3, 'zebra', difficulty='hard')]
+ADDED = [make_word(4, 'banana', 'food', definition='yellow fruit'), make_word(5, 'ant', 'bugs', 'medium')]
+
+
+def test_with_words_matches_a_full_rebuild():
+    base = CatalogSnapshot(1, BASE)
+    base.search_index  # built, so it has to be carried forward
+    derived = base.with_words(2, ADDED)
+    rebuilt = CatalogSnapshot(2, BASE + ADDED)
+
+    assert derived.words == rebuilt.words
+    assert derived.by_id == rebuilt.by_id
+    assert derived.by_category == rebuilt.by_category
+    assert derived.by_difficulty == rebuilt.by_difficulty
+    assert derived.categories == rebuilt.categories
+    assert derived.difficulties == rebuilt.difficulties
+    assert derived._sample_buckets == rebuilt._sample_buckets
+    assert derived.ids == rebuilt.ids
+    assert derived.digest == rebuilt.digest
+    assert derived.sample(3, seed=7) == rebuilt.sample(3, seed=7)
+    assert derived._search_index is not None
+    assert derived.search_index.search('yellow') == rebuilt.search_index.search('yellow')
+    assert derived.suggest_index.complete('a') == rebuilt.suggest_index.complete('a')
+
+
+def test_with_words_leaves_the_previous_snapshot_untouched():
+    base = CatalogSnapshot(1, BASE)
+    base.search_index
+    base.with_words(2, ADDED)
+
+    assert [word['id'] for word in base.words] == [2, 1, 3]
+    assert 'bugs' not in base.by_category
+    assert [word['id'] for word in base.by_category['food']] == [2]
+    assert base.search_index.search('yellow') == (0, [])
+    assert base.suggest_index.complete('b') == []
+
+
+def test_digest_is_computed_on_first_use():
+    snapshot = CatalogSnapshot(1, BASE)
+    assert snapshot._digest is None
+    etag = snapshot.etag('words')
+    assert snapshot._digest is not None
+    assert snapshot.etag('words') == etag
+
+
+def test_search_index_is_built_once_under_concurrent_first_use(monkeypatch):
+    import threading
+    import time
+
+    from src.services import catalog as catalog_module
+
+    builds = []
+
+    class SlowIndex(catalog_module.SearchIndex):
+        def __init__(self, words):
+            builds.append(1)
+            time.sleep(0.05)
+            super().__init__(words)
+
+    monkeypatch.setattr(catalog_module, 'SearchIndex', SlowIndex)
+    snapshot = CatalogSnapshot(1, BASE)
+    indexes = []
+    threads = [threading.Thread(target=lambda: indexes.append(snapshot.search_index)) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(builds) == 1
+    assert all(index is indexes[0] for index in indexes)
+
+
+def test_unknown_filters_are_not_memoized(app, client):
+    with app.app_context():
+        add_words(3)
+
+    assert client.get('/api/words?category=animals').status_code == 200
+    for i in range(50):
+        response = client.get(f'/api/words?category=nope{i}&difficulty=easy')
+        assert response.status_code == 200
+        assert response.get_json() == []
+
+    assert list(catalog.snapshot()._encoded) == [('words', 'animals', 'all', '*')]
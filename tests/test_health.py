@@ -0,0 +1,18 @@
+from src.main import create_app
+
+
+def test_health_checks_the_database(client):
+    response = client.get('/api/health')
+    assert response.status_code == 200
+    body = response.get_json()
+    assert body['database'] == 'connected'
+    assert 'database_latency_ms' in body
+
+
+def test_health_reports_an_unreachable_database():
+    app = create_app({'TESTING': True, 'SQLALCHEMY_DATABASE_URI': 'sqlite:////nonexistent/dir/health.db'})
+
+    for url in ('/api/health', '/api/health/ready'):
+        response = app.test_client().get(url)
+        assert response.status_code == 503
+        assert response.get_json()['database'] == 'unavailable'
@@ -0,0 +1,25 @@
+from tests.conftest import add_words
+
+
+def test_etag_differs_per_content_coding_and_304_varies(app, client):
+    with app.app_context():
+        add_words(100)
+
+    identity = client.get('/api/words', headers={'Accept-Encoding': 'identity'})
+    gzipped = client.get('/api/words', headers={'Accept-Encoding': 'gzip'})
+    assert gzipped.headers['Content-Encoding'] == 'gzip'
+    assert 'Content-Encoding' not in identity.headers
+    assert identity.headers['ETag'] != gzipped.headers['ETag']
+
+    not_modified = client.get('/api/words', headers={
+        'Accept-Encoding': 'gzip', 'If-None-Match': gzipped.headers['ETag']
+    })
+    assert not_modified.status_code == 304
+    assert not_modified.headers['ETag'] == gzipped.headers['ETag']
+    assert not_modified.headers['Vary'] == 'Accept-Encoding'
+
+    # The gzip variant's tag does not validate the identity representation
+    mismatched = client.get('/api/words', headers={
+        'Accept-Encoding': 'identity', 'If-None-Match': gzipped.headers['ETag']
+    })
+    assert mismatched.status_code == 200
@@ -0,0 +1,54 @@
+import threading
+
+import pytest
+
+from src.services.instrumentation import RequestStats, instrumentation, server_timing
+
+
+def failing_view():
+    raise RuntimeError('boom')
+
+
+def request_count(endpoint, status):
+    return instrumentation.registry.requests.get((endpoint, 'GET', status), 0)
+
+
+@pytest.mark.parametrize('propagate', [False, True])
+def test_a_raising_view_is_recorded_as_a_500(make_app, propagate):
+    app = make_app(PROPAGATE_EXCEPTIONS=propagate)
+    endpoint = f'failing_{propagate}'
+    app.add_url_rule(f'/failing/{propagate}', endpoint, failing_view)
+    before = request_count(endpoint, 500)
+
+    client = app.test_client()
+    if propagate:
+        with pytest.raises(RuntimeError):
+            client.get(f'/failing/{propagate}')
+    else:
+        assert client.get(f'/failing/{propagate}').status_code == 500
+
+    assert request_count(endpoint, 500) == before + 1
+    assert f'endpoint="{endpoint}",method="GET",status="500"' in client.get('/metrics').get_data(as_text=True)
+
+
+def test_each_request_is_recorded_once(client):
+    before = request_count('word.get_categories', 200)
+    assert client.get('/api/categories').status_code == 200
+    assert request_count('word.get_categories', 200) == before + 1
+
+
+def test_requests_recorded_on_other_threads_are_merged(client):
+    before = request_count('word.get_categories', 200)
+    worker = threading.Thread(target=lambda: client.get('/api/categories'))
+    worker.start()
+    worker.join()
+    assert client.get('/api/categories').status_code == 200
+    assert request_count('word.get_categories', 200) == before + 2
+
+
+def test_server_timing_lists_only_what_the_request_spent():
+    stats = RequestStats()
+    assert server_timing(0.0012, stats) == 'app;dur=1.20'
+
+    stats.queries, stats.db_time, stats.serialization_time = 2, 0.0005, 0.0001
+    assert server_timing(0.0012, stats) == 'app;dur=1.20, db;dur=0.50;desc="2 queries", ser;dur=0.10'
@@ -0,0 +1,46 @@
+from datetime import datetime, timedelta
+
+from src.models.job import Job
+from src.models.user import db
+from src.services.jobs import jobs
+
+
+def add_job(owner, heartbeat_age, status='running'):
+    heartbeat_at = None if heartbeat_age is None else datetime.utcnow() - timedelta(seconds=heartbeat_age)
+    job = Job(kind='reseed', status=status, owner=owner, heartbeat_at=heartbeat_at)
+    db.session.add(job)
+    db.session.commit()
+    return job.id
+
+
+def test_recover_fails_only_jobs_whose_owner_is_gone(app):
+    with app.app_context():
+        live = add_job('other-host:42', heartbeat_age=5)
+        live_queued = add_job('other-host:42', heartbeat_age=5, status='queued')
+        stale = add_job('dead-host:7', heartbeat_age=jobs.stale_after + 30)
+        legacy = add_job(None, heartbeat_age=None)
+        previous_self = add_job(jobs.owner, heartbeat_age=1)
+        finished = add_job('dead-host:7', heartbeat_age=3600, status='succeeded')
+
+        assert jobs.recover() == 3
+
+        status = {job.id: job.status for job in Job.query.all()}
+        assert status[live] == 'running'
+        assert status[live_queued] == 'queued'
+        assert status[stale] == status[legacy] == status[previous_self] == 'failed'
+        assert status[finished] == 'succeeded'
+
+
+def test_beat_refreshes_only_this_processes_active_jobs(app):
+    with app.app_context():
+        mine = add_job(jobs.owner, heartbeat_age=300)
+        done = add_job(jobs.owner, heartbeat_age=300, status='succeeded')
+        theirs = add_job('other-host:42', heartbeat_age=300)
+
+    jobs.beat()
+
+    with app.app_context():
+        age = {job.id: datetime.utcnow() - job.heartbeat_at for job in Job.query.all()}
+        assert age[mine] < timedelta(seconds=5)
+        assert age[done] > timedelta(seconds=200)
+        assert age[theirs] > timedelta(seconds=200)
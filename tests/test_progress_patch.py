@@ -0,0 +1,41 @@
+import json
+
+from sqlalchemy.dialects import postgresql
+
+from src.models.user import User, db
+from src.routes.user import progress_patch_values
+
+from tests.conftest import add_user
+
+
+def test_patch_merges_json_fields_and_echoes_the_patch(app, client):
+    with app.app_context():
+        user_id = add_user(progress_data=json.dumps({'a': 1, 'b': 2, 'nested': {'x': 1, 'y': 2}}), best_streak=5)
+
+    patch = {'xp': 30, 'current_streak': 3, 'progress_data': {'b': None, 'c': 3, 'nested': {'y': None, 'z': 4}}}
+    response = client.patch(f'/api/users/{user_id}/progress', json=patch)
+
+    assert response.status_code == 200
+    assert response.get_json()['changes'] == {**patch, 'best_streak': 3}
+    with app.app_context():
+        user = db.session.get(User, user_id)
+        assert user.get_progress_data() == {'a': 1, 'c': 3, 'nested': {'x': 1, 'z': 4}}
+        assert (user.xp, user.current_streak, user.best_streak) == (30, 3, 5)
+
+
+def test_patch_unknown_user_is_404(client):
+    assert client.patch('/api/users/999/progress', json={'xp': 1}).status_code == 404
+
+
+def test_postgres_patch_sends_only_the_patch():
+    stmt = db.update(User).where(User.id == 1).values(**progress_patch_values({
+        'progress_data': {'b': None, 'c': 3, 'nested': {'y': None}},
+        'achievements': ['first']
+    }))
+    compiled = stmt.compile(dialect=postgresql.dialect())
+    sql = str(compiled)
+
+    assert 'SELECT' not in sql
+    assert 'jsonb_set' in sql and '||' in sql and ' - ' in sql
+    parameters = set(map(str, compiled.params.values()))
+    assert {'{"c": 3}', '["first"]'} <= parameters
@@ -0,0 +1,51 @@
+import pytest
+
+from src.models.word import Word
+from src.services.query_log import QueryBudgetExceeded, query_inspector
+
+from tests.conftest import add_words
+
+THRESHOLD = 3
+
+
+def lookup_one_by_one():
+    # One query per word: the N+1 shape the inspector should flag
+    for word_id in range(1, THRESHOLD + 2):
+        Word.query.filter_by(id=word_id).first()
+    return {'ok': True}
+
+
+@pytest.fixture
+def dev_app(make_app, monkeypatch):
+    monkeypatch.setenv('QUERY_LOG', 'dev')
+    monkeypatch.setenv('N_PLUS_ONE_THRESHOLD', str(THRESHOLD))
+    app = make_app('query_log')
+    app.add_url_rule('/one-by-one', 'one_by_one', lookup_one_by_one)
+    with app.app_context():
+        add_words(THRESHOLD + 1)
+    return app
+
+
+def test_dev_mode_flags_a_statement_repeated_past_the_threshold(dev_app, capsys):
+    before = query_inspector.n_plus_one
+
+    assert dev_app.test_client().get('/one-by-one').status_code == 200
+
+    assert query_inspector.n_plus_one == before + 1
+    output = capsys.readouterr().out
+    assert f'Possible N+1 in one_by_one: {THRESHOLD + 1}x SELECT' in output
+
+
+def test_dev_mode_ignores_a_statement_at_the_threshold(dev_app, monkeypatch):
+    monkeypatch.setattr(query_inspector, 'repeat_threshold', THRESHOLD + 1)
+    before = query_inspector.n_plus_one
+
+    assert dev_app.test_client().get('/one-by-one').status_code == 200
+
+    assert query_inspector.n_plus_one == before
+
+
+def test_query_budget_fails_a_block_over_budget(client, query_budget):
+    with pytest.raises(QueryBudgetExceeded, match='budget is 0'):
+        with query_budget(0):
+            client.get('/api/users/1/test-results')
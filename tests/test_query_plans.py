@@ -0,0 +1,86 @@
+"""
+EXPLAIN QUERY PLAN (SQLite) for the statements each route actually runs:
+every lookup has to be served by an index, never a table scan.
+"""
+
+import pytest
+from sqlalchemy import event
+
+from src.models.user import db
+from tests.conftest import add_progress, add_user, add_words
+
+NDJSON = {'Accept': 'application/x-ndjson'}
+NOT_YET_DUE = 2 ** 40
+
+# (method, url, json body, headers, index the route's lookup must use)
+ROUTES = [
+    ('GET', '/api/words?user_id={user_id}', None, {}, 'uq_user_word_progress_user_word'),
+    ('GET', '/api/words?category=animals&difficulty=easy', None, NDJSON, 'ix_word_category_difficulty'),
+    ('GET', '/api/words?difficulty=easy', None, NDJSON, 'ix_word_difficulty'),
+    ('GET', '/api/users/{user_id}/next-words', None, {}, 'ix_user_word_progress_user_due'),
+    # Nothing due yet, so the never-practiced fallback runs as well
+    ('GET', '/api/users/{learner_id}/next-words', None, {}, 'uq_user_word_progress_user_word'),
+    ('GET', '/api/users/{user_id}/test-results', None, {}, 'ix_test_result_user_completed'),
+    ('POST', '/api/words', {'word': 'word1', 'definition': 'duplicate', 'category': 'animals', 'difficulty': 'easy'}, {}, 'ix_word_word'),
+    ('POST', '/api/words/bulk', {'words': [{'word': 'fresh', 'definition': 'new'}]}, {}, 'ix_word_word'),
+]
+
+
+def query_plan(statement, parameters):
+    rows = db.session.connection().exec_driver_sql(f'EXPLAIN QUERY PLAN {statement}', parameters).fetchall()
+    return [row[-1] for row in rows]
+
+
+def is_catalog_load(statement):
+    # The catalog snapshot reads the whole word table on purpose, once per TTL
+    return statement.lstrip().startswith('SELECT') and ' FROM word' in statement and 'WHERE' not in statement
+
+
+@pytest.fixture
+def seeded(app):
+    with app.app_context():
+        word_ids = add_words(50)
+        user_id = add_user()
+        add_progress(user_id, word_ids[:10])
+        learner_id = add_user('learner')
+        add_progress(learner_id, word_ids[:10], due_at=NOT_YET_DUE)
+    return {'user_id': user_id, 'learner_id': learner_id}
+
+
+@pytest.mark.parametrize('method, url, body, headers, index', ROUTES)
+def test_route_queries_use_indexes(app, client, seeded, method, url, body, headers, index):
+    # Warm the catalog so its deliberate full load is not part of the route
+    client.get('/api/words')
+
+    with app.app_context():
+        engine = db.engine
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().startswith(('SELECT', 'UPDATE', 'DELETE')) and not executemany:
+            statements.append((statement, parameters))
+
+    event.listen(engine, 'before_cursor_execute', capture)
+    try:
+        response = client.open(url.format(**seeded), method=method, json=body, headers=headers)
+        response.get_data()  # drain streamed bodies
+    finally:
+        event.remove(engine, 'before_cursor_execute', capture)
+    assert response.status_code < 500
+
+    lookups = [(statement, parameters) for statement, parameters in statements if not is_catalog_load(statement)]
+    assert lookups, 'route ran no lookups to check'
+
+    with app.app_context():
+        plans = [query_plan(statement, parameters) for statement, parameters in lookups]
+
+    for (statement, _), plan in zip(lookups, plans):
+        scans = [step for step in plan if step.startswith('SCAN') and 'USING' not in step]
+        assert not scans, f'table scan in {statement!r}: {plan}'
+    assert any(index in step for plan in plans for step in plan), plans
+
+
+def test_next_words_falls_back_to_unseen_words(client, seeded):
+    words = client.get(f"/api/users/{seeded['learner_id']}/next-words?count=5").get_json()
+    assert len(words) == 5
+    assert all(word['user_progress'] is None for word in words)
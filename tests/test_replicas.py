@@ -0,0 +1,61 @@
+import shutil
+import time
+
+import pytest
+
+from src.models.user import db
+from src.models.word import TestResult as Result
+
+from tests.conftest import add_user
+
+STICKY_SECONDS = 0.5
+
+
+@pytest.fixture
+def replicated(make_app, tmp_path, monkeypatch):
+    """An app on primary.db whose replica reads go to replica.db, a stale copy of it"""
+    monkeypatch.setenv('DATABASE_REPLICA_URLS', f'sqlite:///{tmp_path / "replica.db"}')
+    monkeypatch.setenv('DATABASE_REPLICA_STICKY_SECONDS', str(STICKY_SECONDS))
+    app = make_app('primary')
+    with app.app_context():
+        writer = add_user('writer')
+        other = add_user('other')
+        db.session.remove()
+        db.engine.dispose()
+    # The replica has both users but never receives anything written from here on
+    shutil.copy(tmp_path / 'primary.db', tmp_path / 'replica.db')
+    return app, writer, other
+
+
+def result_count(client, user_id):
+    response = client.get(f'/api/users/{user_id}/test-results')
+    assert response.status_code == 200
+    return len(response.get_json())
+
+
+def test_reads_follow_the_users_own_writes_to_the_primary(replicated):
+    app, writer, other = replicated
+    client = app.test_client()
+
+    response = client.post(f'/api/users/{writer}/test-results', json={'score': 4, 'total_questions': 5})
+    assert response.status_code == 201
+    with app.app_context():
+        db.session.add(Result(user_id=other, test_type='quiz', score=1, total_questions=5))
+        db.session.commit()
+
+    # The writer reads from the primary; the other user, with no write through the API, from the replica
+    assert result_count(client, writer) == 1
+    assert result_count(client, other) == 0
+
+    # Once the window passes, the writer is back on the (still stale) replica
+    time.sleep(STICKY_SECONDS + 0.1)
+    assert result_count(client, writer) == 0
+
+
+def test_stickiness_needs_no_cookie(replicated):
+    app, writer, _ = replicated
+
+    response = app.test_client().post(f'/api/users/{writer}/test-results', json={'score': 4, 'total_questions': 5})
+    assert 'Set-Cookie' not in response.headers
+    # A fresh client shares nothing with the one that wrote
+    assert result_count(app.test_client(), writer) == 1
@@ -0,0 +1,72 @@
+import pytest
+
+from src.models.user import User, db
+from src.models.word import UserWordProgress
+from src.models import word as word_models
+
+from tests.conftest import add_user, add_words
+
+
+@pytest.fixture
+def learner(app):
+    with app.app_context():
+        word_ids = add_words(3)
+        user_id = add_user(total_tests_taken=4)
+    return user_id, word_ids
+
+
+def test_session_saves_answers_and_test_in_one_delta(app, client, learner):
+    user_id, (first, second, _) = learner
+
+    response = client.post(f'/api/users/{user_id}/sessions', json={
+        'answers': [
+            {'word_id': first, 'status': 'learning', 'correct': True},
+            {'word_id': second, 'status': 'learning', 'correct': False},
+            {'word_id': first, 'status': 'known', 'correct': True},
+        ],
+        'test': {'test_type': 'quiz', 'time_taken': 30}
+    })
+
+    assert response.status_code == 201
+    payload = response.get_json()
+    progress = {row['word_id']: row for row in payload['progress']}
+    assert (progress[first]['status'], progress[first]['attempts'], progress[first]['correct_attempts']) == ('known', 2, 2)
+    assert (progress[second]['attempts'], progress[second]['correct_attempts']) == (1, 0)
+    assert (payload['result']['score'], payload['result']['total_questions']) == (2, 3)
+    assert payload['total_tests_taken'] == 5
+
+    with app.app_context():
+        assert db.session.get(User, user_id).total_tests_taken == 5
+        assert word_models.TestResult.query.filter_by(user_id=user_id).count() == 1
+
+
+@pytest.mark.parametrize('body, status', [
+    ({'answers': [{'word_id': '1'}]}, 400),
+    ({'answers': [{'word_id': {'id': 1}}]}, 400),
+    ({'answers': [{'word_id': 1, 'correct': 'yes'}]}, 400),
+    ({'answers': [{'word_id': 1, 'status': 5}]}, 400),
+    ({'answers': ['word']}, 400),
+    ({'answers': {'word_id': 1}}, 400),
+    ({'test': 'quiz'}, 400),
+    ({'answers': [{'word_id': 99999, 'correct': True}], 'test': {}}, 404),
+])
+def test_session_rejects_malformed_answers_without_writing(app, client, learner, body, status):
+    user_id, _ = learner
+
+    response = client.post(f'/api/users/{user_id}/sessions', json=body)
+
+    assert response.status_code == status
+    with app.app_context():
+        assert UserWordProgress.query.count() == 0
+        assert word_models.TestResult.query.count() == 0
+        assert db.session.get(User, user_id).total_tests_taken == 4
+
+
+def test_session_for_unknown_user_is_404(app, client, learner):
+    _, word_ids = learner
+
+    response = client.post('/api/users/999/sessions', json={'answers': [{'word_id': word_ids[0]}], 'test': {}})
+
+    assert response.status_code == 404
+    with app.app_context():
+        assert word_models.TestResult.query.count() == 0
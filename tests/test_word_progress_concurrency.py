@@ -0,0 +1,42 @@
+import threading
+
+from src.models.word import UserWordProgress
+
+from tests.conftest import add_user, add_words
+
+THREADS = 8
+ANSWERS_PER_THREAD = 10
+
+
+def test_concurrent_answers_for_one_word_lose_nothing(app):
+    with app.app_context():
+        word_id = add_words(1)[0]
+        user_id = add_user()
+
+    barrier = threading.Barrier(THREADS)
+    statuses = []
+
+    def answer(thread_index):
+        client = app.test_client()
+        barrier.wait()
+        for i in range(ANSWERS_PER_THREAD):
+            response = client.post(f'/api/users/{user_id}/word-progress', json={
+                'word_id': word_id,
+                'status': 'learning',
+                'correct': i % 2 == 0
+            })
+            statuses.append(response.status_code)
+
+    threads = [threading.Thread(target=answer, args=(i,)) for i in range(THREADS)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert statuses == [200] * (THREADS * ANSWERS_PER_THREAD)
+    with app.app_context():
+        rows = UserWordProgress.query.filter_by(user_id=user_id, word_id=word_id).all()
+        assert len(rows) == 1
+        assert rows[0].attempts == THREADS * ANSWERS_PER_THREAD
+        assert rows[0].correct_attempts == THREADS * ANSWERS_PER_THREAD // 2
+        assert rows[0].mastery_level == 0.5
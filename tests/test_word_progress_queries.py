@@ -0,0 +1,59 @@
+from src.services.query_log import count_queries
+
+from tests.conftest import add_progress, add_user, add_words
+
+SMALL_CATALOG = 20
+LARGE_CATALOG = 400
+
+
+def progress_queries(make_app, word_count, url):
+    """Queries run by url (formatted with user_id) against a catalog of word_count words"""
+    app = make_app(f'catalog_{word_count}')
+    with app.app_context():
+        word_ids = add_words(word_count)
+        user_id = add_user()
+        add_progress(user_id, word_ids)
+
+    client = app.test_client()
+    # Warm the catalog snapshot so only the progress lookup is counted
+    assert client.get('/api/words').status_code == 200
+
+    with count_queries() as counted:
+        response = client.get(url.format(user_id=user_id))
+    assert response.status_code == 200
+    return len(counted), response.get_json()
+
+
+def test_word_list_progress_is_one_query_at_any_catalog_size(make_app):
+    small, small_words = progress_queries(make_app, SMALL_CATALOG, '/api/words?user_id={user_id}')
+    large, large_words = progress_queries(make_app, LARGE_CATALOG, '/api/words?user_id={user_id}')
+
+    assert len(small_words) == SMALL_CATALOG
+    assert len(large_words) == LARGE_CATALOG
+    assert all(word['user_progress']['status'] == 'learning' for word in large_words)
+    assert small == large == 1
+
+
+def test_random_words_progress_is_one_query_at_any_catalog_size(make_app):
+    url = '/api/words/random?count=10&user_id={user_id}'
+    small, _ = progress_queries(make_app, SMALL_CATALOG, url)
+    large, large_words = progress_queries(make_app, LARGE_CATALOG, url)
+
+    assert len(large_words) == 10
+    assert all('user_progress' in word for word in large_words)
+    assert small == large == 1
+
+
+def test_word_list_with_progress_stays_within_budget(make_app, query_budget):
+    app = make_app()
+    with app.app_context():
+        word_ids = add_words(SMALL_CATALOG)
+        user_id = add_user()
+        add_progress(user_id, word_ids)
+
+    client = app.test_client()
+    assert client.get('/api/words').status_code == 200
+
+    with query_budget(1):
+        response = client.get(f'/api/words?user_id={user_id}')
+    assert response.status_code == 200
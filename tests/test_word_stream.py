@@ -0,0 +1,40 @@
+import json
+
+from src.services.query_log import count_queries
+
+from tests.conftest import add_words
+
+NDJSON = {'Accept': 'application/x-ndjson'}
+
+
+def streamed(client, url):
+    with count_queries() as counted:
+        response = client.get(url, headers=NDJSON)
+        lines = [json.loads(line) for line in response.get_data(as_text=True).splitlines() if line]
+    assert response.status_code == 200
+    return lines, counted.statements
+
+
+def test_stream_selects_only_the_requested_columns(app, client):
+    with app.app_context():
+        add_words(5)
+
+    words, statements = streamed(client, '/api/words?fields=word,emoji&category=animals')
+
+    assert len(words) == 5
+    assert all(set(word) == {'id', 'word', 'emoji'} for word in words)
+    [select] = statements
+    columns = select.split('FROM')[0]
+    assert 'word.emoji' in columns and 'word.definition' not in columns and 'word.created_at' not in columns
+
+
+def test_stream_without_fields_returns_whole_words(app, client):
+    with app.app_context():
+        add_words(2)
+
+    words, _ = streamed(client, '/api/words')
+
+    assert set(words[0]) == {
+        'id', 'word', 'pronunciation', 'definition', 'example', 'fun_fact', 'image_url',
+        'emoji', 'category', 'difficulty', 'created_at', 'updated_at'
+    }
@@ -0,0 +1,149 @@
+import glob
+import json
+
+import pytest
+from sqlalchemy import exc
+
+from src.models.user import User, db
+from src.models.word import UserWordProgress
+from src.services.word_import import import_words
+from src.services.write_behind import WriteBehindBuffer
+
+from tests.conftest import add_user, add_words
+
+
+@pytest.fixture
+def buffer(app, tmp_path, monkeypatch):
+    """A write-behind buffer of its own, journaling under tmp_path"""
+    monkeypatch.setenv('WRITE_BEHIND_ENABLED', '1')
+    monkeypatch.setenv('WRITE_BEHIND_JOURNAL', str(tmp_path / 'write_behind.jsonl'))
+    buffer = WriteBehindBuffer()
+    buffer.init_app(app)
+    return buffer
+
+
+def write_crashed_journal(buffer, records, torn_tail=True):
+    """A journal as a dead worker process would have left it"""
+    with open(f'{buffer.journal_base}.999999', 'w', encoding='utf-8') as journal:
+        for record in records:
+            journal.write(json.dumps(record) + '\n')
+        if torn_tail:
+            journal.write('{"type": "answer", "user_id"')
+
+
+def answer(user_id, word_id, correct=True):
+    return {'type': 'answer', 'user_id': user_id, 'answer': {'word_id': word_id, 'status': 'learning', 'correct': correct}}
+
+
+def test_recover_replays_a_crashed_journal(app, buffer):
+    with app.app_context():
+        word_id = add_words(1)[0]
+        user_id = add_user()
+
+    write_crashed_journal(buffer, [
+        {'type': 'user', 'user_id': user_id, 'changes': {'xp': 40, 'best_streak': 3}},
+        answer(user_id, word_id),
+        {'type': 'user', 'user_id': user_id, 'changes': {'xp': 55, 'best_streak': 2}},
+        answer(user_id, word_id, correct=False),
+    ])
+
+    with app.app_context():
+        buffer.recover()
+
+    with app.app_context():
+        user = db.session.get(User, user_id)
+        assert (user.xp, user.best_streak) == (55, 3)
+        progress = UserWordProgress.query.filter_by(user_id=user_id, word_id=word_id).one()
+        assert (progress.attempts, progress.correct_attempts) == (2, 1)
+
+    assert glob.glob(f'{buffer.journal_base}.*') == []
+    assert buffer.stats()['pending_records'] == 0
+
+
+def test_rejected_writes_do_not_block_the_buffer(app, buffer):
+    with app.app_context():
+        word_id = add_words(1)[0]
+        good_user = add_user('good')
+        bad_user = add_user('bad')
+
+    write_crashed_journal(buffer, [
+        answer(good_user, word_id),
+        answer(bad_user, {'id': word_id}),
+    ], torn_tail=False)
+
+    with app.app_context():
+        buffer.recover()
+        buffer.add_answer(good_user, {'word_id': word_id, 'status': 'learning', 'correct': True})
+        buffer.flush()
+
+    with app.app_context():
+        assert UserWordProgress.query.filter_by(user_id=good_user).one().attempts == 2
+        assert UserWordProgress.query.filter_by(user_id=bad_user).count() == 0
+
+    with open(buffer.rejected_path, encoding='utf-8') as rejected:
+        records = [json.loads(line) for line in rejected]
+    assert [record['user_id'] for record in records] == [bad_user]
+    assert glob.glob(f'{buffer.journal_base}.*') == []
+    assert buffer.stats()['rejected_records'] == 1
+
+
+def test_requeued_best_streak_keeps_the_maximum(app, buffer, monkeypatch):
+    with app.app_context():
+        user_id = add_user(best_streak=3)
+
+    buffer.update_user(user_id, {'current_streak': 10, 'best_streak': 10})
+    write = buffer._write
+
+    def lose_connection(user_changes, answers):
+        # A streak reset arrives while the flush is in flight, then the database goes away
+        buffer.update_user(user_id, {'current_streak': 0, 'best_streak': 0})
+        raise exc.OperationalError('UPDATE user', {}, Exception('connection lost'))
+
+    monkeypatch.setattr(buffer, '_write', lose_connection)
+    with pytest.raises(exc.OperationalError):
+        buffer.flush()
+    monkeypatch.setattr(buffer, '_write', write)
+    buffer.flush()
+
+    with app.app_context():
+        user = db.session.get(User, user_id)
+        assert (user.current_streak, user.best_streak) == (0, 10)
+
+
+def test_word_progress_accepts_a_word_missing_from_a_stale_catalog(app, client):
+    with app.app_context():
+        add_words(1)
+        user_id = add_user()
+    client.get('/api/words')  # this worker's snapshot is now loaded
+
+    with app.app_context():
+        # As if another worker created it: committed, but this snapshot never hears of it
+        created, _ = import_words([{'word': 'newcomer', 'definition': 'just added'}])
+        db.session.commit()
+
+    response = client.post(f'/api/users/{user_id}/word-progress', json={'word_id': created[0]['id']})
+    assert response.status_code == 200
+
+
+@pytest.mark.parametrize('body, status', [
+    ({'word_id': {'id': 1}}, 400),
+    ({'word_id': '1'}, 400),
+    ({'word_id': True}, 400),
+    ({'word_id': 1, 'correct': 'yes'}, 400),
+    ({'word_id': 1, 'status': ['known']}, 400),
+    ({'word_id': 12345}, 404),
+])
+def test_word_progress_rejects_malformed_answers(app, client, body, status):
+    with app.app_context():
+        add_words(1)
+        user_id = add_user()
+
+    response = client.post(f'/api/users/{user_id}/word-progress', json=body)
+    assert response.status_code == status
+
+
+@pytest.mark.parametrize('url', ['/api/words?user_id=abc', '/api/words/random?user_id=abc'])
+def test_word_lists_reject_a_non_integer_user_id(client, url):
+    response = client.get(url)
+    assert response.status_code == 400
+    assert response.get_json() == {'error': 'user_id must be an integer'}
@@ -0,0 +1,28 @@
+"""
+Production WSGI entry point for Word Adventure.
+
+    gunicorn -c gunicorn.conf.py wsgi:app
+
+Importing this module builds the Flask app and runs process startup once:
+schema creation and seeding (unless AUTO_INIT_DB=0, in which case run
+`flask --app src.main init-db` as a release step), write-behind recovery and,
+unless PRELOAD_CATALOG=0, loading the word catalog snapshot so the first
+requests of every worker are served from memory.
+"""
+
+import os
+
+from src.main import app, startup
+from src.services.catalog import catalog
+
+startup(app)
+
+if os.getenv('PRELOAD_CATALOG', '1') == '1':
+    with app.app_context():
+        try:
+            snapshot = catalog.snapshot()
+            print(f"✅ Catalog preloaded ({len(snapshot.words)} words)")
+        except Exception as e:
+            print(f"❌ Catalog preload failed: {str(e)}")
+
+application = app